@@ -4,35 +4,96 @@ Chart Generator Module
 Creates professional, publication-ready charts and visualizations.
 """
 
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-import matplotlib.patches as mpatches
-import seaborn as sns
-import pandas as pd
+import matplotlib
+from matplotlib import cycler
+from matplotlib.artist import setp
+from matplotlib.ticker import Formatter
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from PIL import Image
 import numpy as np
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import hashlib
+import json
 import logging
+import os
 from typing import Dict, List, Optional, Tuple, Any
 
 from config import get_config
 
+# Chart creators run by generate_all_charts (in output order) and their file stems
+CHART_METHODS = {
+    'create_sales_trend_chart': 'sales_trend',
+    'create_orders_trend_chart': 'orders_trend',
+    'create_product_analysis_chart': 'product_analysis',
+    'create_customer_analysis_chart': 'customer_analysis',
+    'create_performance_dashboard': 'performance_dashboard',
+}
+
+# Precomputed equivalent of seaborn.color_palette("husl")
+HUSL_PALETTE = ['#f77189', '#bb9832', '#50b131', '#36ada4', '#3ba3ec', '#e866f4']
+
+# Image formats the generator may have written, for cleanup
+CHART_EXTENSIONS = ('.png', '.webp', '.pdf', '.svg')
+
+_worker_generator = None
+
+class _CurrencyFormatter(Formatter):
+    """Tick formatter producing whole-unit currency labels such as '$12,345'."""
+    
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+    
+    def __call__(self, x, pos=None):
+        return f"{self.symbol}{round(x):,}"
+
+def _init_chart_worker(config):
+    """Initialize a chart worker process with a headless backend."""
+    global _worker_generator
+    matplotlib.use("Agg")
+    _worker_generator = ChartGenerator(config)
+
+def _render_chart(method_name: str, chart_data: Dict[str, Any], metrics: Dict[str, Any]) -> Path:
+    """Render a single chart inside a worker process."""
+    return getattr(_worker_generator, method_name)(chart_data, metrics)
+
 class ChartGenerator:
     """Generates professional charts and visualizations for business reports."""
     
+    # COLORS keys used, in order, for the product bars
+    _BAR_PALETTE = ('primary', 'positive', 'accent1', 'accent2', 'warning')
+    
     def __init__(self, config=None):
         """Initialize the chart generator."""
         self.config = config or get_config()
         self.logger = logging.getLogger(__name__)
         self.charts_dir = self.config.CHARTS_DIR
         
-        # Set up matplotlib and seaborn styling
+        # Set up matplotlib styling
         self._setup_chart_styling()
         
+        # Currency tick formatter shared by all currency axes
+        self._currency_fmt = _CurrencyFormatter(self.config.METRICS_CONFIG['currency_symbol'])
+        
+        # Static color tables, resolved once instead of per chart
+        self._bar_colors = [self.config.COLORS[key] for key in self._BAR_PALETTE]
+        self._set3 = matplotlib.colormaps['Set3'](np.linspace(0, 1, 12))
+        
+        # Single figure/canvas pair reused by every chart; constrained layout
+        # is solved during the save draw, so no separate tight_layout pass
+        self._fig = Figure(figsize=self.config.CHART_CONFIG['figure_size'],
+                           dpi=self.config.CHART_CONFIG['dpi'],
+                           facecolor='white',
+                           edgecolor='none',
+                           layout='constrained')
+        self._canvas = FigureCanvasAgg(self._fig)
+        
     def _setup_chart_styling(self):
-        """Configure matplotlib and seaborn styling for professional charts."""
+        """Configure matplotlib styling for professional charts."""
         # Set matplotlib parameters
-        plt.rcParams.update({
+        matplotlib.rcParams.update({
             'figure.figsize': self.config.CHART_CONFIG['figure_size'],
             'figure.dpi': self.config.CHART_CONFIG['dpi'],
             'font.size': self.config.CHART_CONFIG['font_size'],
@@ -49,77 +110,134 @@ class ChartGenerator:
             'axes.grid.alpha': 0.3,
             'grid.linewidth': 0.5,
             'lines.linewidth': 2.5,
-            'lines.markersize': 6
+            'lines.markersize': 6,
+            'agg.path.chunksize': 10000,
+            # Whitegrid look without importing seaborn
+            'axes.facecolor': 'white',
+            'axes.edgecolor': '.8',
+            'axes.labelcolor': '.15',
+            'axes.axisbelow': True,
+            'grid.color': '.8',
+            'grid.linestyle': '-',
+            'text.color': '.15',
+            'xtick.color': '.15',
+            'ytick.color': '.15',
+            'patch.edgecolor': 'w',
+            'lines.solid_capstyle': 'round',
+            # Six-color HUSL palette (seaborn's "husl" default)
+            'axes.prop_cycle': cycler('color', HUSL_PALETTE)
         })
+    
+    def _reset_figure(self, figsize: Tuple[float, float]) -> Figure:
+        """Clear the shared figure and resize it for the next chart."""
+        self._fig.clear()
+        self._fig.set_size_inches(figsize)
+        return self._fig
+    
+    def _finalize_time_axis(self, ax, fig, filename: Path):
+        """Apply the shared weekly date axis and grid styling, then save the chart."""
+        from matplotlib import dates as mdates
+        
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%d %b'))
+        ax.xaxis.set_major_locator(mdates.WeekdayLocator(interval=1))
+        ax.tick_params(axis='x', labelrotation=45)
+        
+        ax.grid(True, alpha=0.3)
+        ax.set_axisbelow(True)
+        
+        self._save(fig, filename)
+    
+    def _chart_path(self, stem: str) -> Path:
+        """Build a chart file path using the configured image format."""
+        return self.charts_dir / f"{stem}.{self.config.CHART_CONFIG['save_format']}"
+    
+    def _save(self, fig, filename: Path, dpi: Optional[int] = None):
+        """Write a figure to disk with fast encoder settings for its format."""
+        save_format = self.config.CHART_CONFIG['save_format']
+        if save_format == 'webp':
+            pil_kwargs = {'lossless': True, 'quality': 80, 'method': 4}
+        elif save_format == 'png':
+            pil_kwargs = {'compress_level': self.config.CHART_CONFIG['png_compress_level'],
+                          'optimize': False}
+        else:
+            # Vector formats are not written through Pillow
+            fig.savefig(filename, format=save_format, facecolor='white', edgecolor='none')
+            return
         
-        # Set seaborn style
-        sns.set_style("whitegrid")
-        sns.set_palette("husl")
+        # Raster formats: hand the Agg RGBA buffer straight to Pillow,
+        # skipping savefig's own intermediate copy
+        dpi = dpi or self.config.CHART_CONFIG['dpi']
+        fig.set_dpi(dpi)
+        buffer, size = fig.canvas.print_to_buffer()
+        image = Image.frombuffer('RGBA', size, buffer, 'raw', 'RGBA', 0, 1)
+        image.save(filename, format=save_format.upper(), dpi=(dpi, dpi), **pil_kwargs)
     
     def create_sales_trend_chart(self, chart_data: Dict[str, Any], metrics: Dict[str, Any]) -> Path:
-        """Create a professional sales trend line chart."""
+        """Create a professional sales trend line chart.
+        
+        Numeric series in chart_data may be lists or NumPy arrays.
+        """
         try:
+            palette = self.config.COLORS
+            currency = self.config.METRICS_CONFIG['currency_symbol']
+            
             # Prepare data
-            dates = pd.to_datetime(chart_data['dates'])
-            sales = chart_data['sales']
+            dates = np.asarray(chart_data['dates'], dtype='datetime64[D]')
+            sales = np.asarray(chart_data['sales'], dtype=np.float32)
             
             # Create figure and axis
-            fig, ax = plt.subplots(figsize=(14, 8))
+            fig = self._reset_figure((14, 8))
+            ax = fig.add_subplot(111)
             
             # Main line plot
             line = ax.plot(dates, sales, 
-                          color=self.config.COLORS['primary'],
+                          color=palette['primary'],
                           linewidth=3,
                           marker='o',
                           markersize=8,
                           markerfacecolor='white',
                           markeredgewidth=2,
-                          markeredgecolor=self.config.COLORS['primary'],
+                          markeredgecolor=palette['primary'],
+                          rasterized=True,
                           label='Weekly Sales')
             
             # Add trend line
             if len(sales) > 2:
-                z = np.polyfit(range(len(sales)), sales, 1)
-                p = np.poly1d(z)
-                trend_line = ax.plot(dates, p(range(len(sales))),
-                                   color=self.config.COLORS['secondary'],
+                # Imported lazily so the JIT is only compiled when a trend is drawn
+                from chart_numerics import trend_and_average
+                slope, _, trend, _ = trend_and_average(sales)
+                trend_line = ax.plot(dates, trend,
+                                   color=palette['secondary'],
                                    linestyle='--',
                                    alpha=0.7,
                                    linewidth=2,
-                                   label=f'Trend Line ({"↗" if z[0] > 0 else "↘"})')
+                                   rasterized=True,
+                                   label=f'Trend Line ({"↗" if slope > 0 else "↘"})')
             
             # Highlight current week point
             if len(dates) > 0:
-                ax.scatter(dates.iloc[-1], sales[-1],
-                          color=self.config.COLORS['positive'],
+                ax.scatter(dates[-1], sales[-1],
+                          color=palette['positive'],
                           s=150,
                           zorder=10,
                           edgecolor='white',
                           linewidth=2,
+                          rasterized=True,
                           label='Current Week')
             
             # Formatting
             ax.set_title('Weekly Sales Performance Trend', 
                         fontsize=18, 
                         fontweight='bold',
-                        color=self.config.COLORS['text_dark'],
+                        color=palette['text_dark'],
                         pad=20)
             
             ax.set_xlabel('Week', fontsize=14, fontweight='medium')
-            ax.set_ylabel(f'Sales ({self.config.METRICS_CONFIG["currency_symbol"]})', 
+            ax.set_ylabel(f'Sales ({currency})', 
                          fontsize=14, fontweight='medium')
             
             # Format y-axis with currency
-            ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{self.config.METRICS_CONFIG["currency_symbol"]}{x:,.0f}'))
-            
-            # Format x-axis dates
-            ax.xaxis.set_major_formatter(mdates.DateFormatter('%d %b'))
-            ax.xaxis.set_major_locator(mdates.WeekdayLocator(interval=1))
-            plt.xticks(rotation=45)
-            
-            # Add grid styling
-            ax.grid(True, alpha=0.3, linestyle='-', linewidth=0.5)
-            ax.set_axisbelow(True)
+            ax.yaxis.set_major_formatter(self._currency_fmt)
             
             # Add performance indicators
             current_sales = metrics['current_week']['sales']
@@ -127,26 +245,18 @@ class ChartGenerator:
             
             # Add average line
             ax.axhline(y=avg_sales, 
-                      color=self.config.COLORS['warning'],
+                      color=palette['warning'],
                       linestyle=':',
                       alpha=0.8,
                       linewidth=2,
-                      label=f'Average ({self.config.METRICS_CONFIG["currency_symbol"]}{avg_sales:,.0f})')
+                      label=f'Average ({currency}{avg_sales:,.0f})')
             
             # Legend
             ax.legend(loc='upper left', frameon=True, fancybox=True, shadow=True)
             
-            # Tight layout
-            plt.tight_layout()
-            
-            # Save chart
-            filename = self.charts_dir / 'sales_trend.png'
-            plt.savefig(filename, 
-                       dpi=self.config.CHART_CONFIG['dpi'],
-                       bbox_inches='tight',
-                       facecolor='white',
-                       edgecolor='none')
-            plt.close()
+            # Date axis, grid and save
+            filename = self._chart_path('sales_trend')
+            self._finalize_time_axis(ax, fig, filename)
             
             self.logger.info(f"Sales trend chart created: {filename}")
             return filename
@@ -158,79 +268,69 @@ class ChartGenerator:
     def create_orders_trend_chart(self, chart_data: Dict[str, Any], metrics: Dict[str, Any]) -> Path:
         """Create orders trend chart with dual-axis for AOV."""
         try:
-            dates = pd.to_datetime(chart_data['dates'])
-            orders = chart_data['orders']
-            aov = chart_data['aov']
+            palette = self.config.COLORS
+            currency = self.config.METRICS_CONFIG['currency_symbol']
+            
+            dates = np.asarray(chart_data['dates'], dtype='datetime64[D]')
+            orders = np.asarray(chart_data['orders'], dtype=np.float32)
+            aov = np.asarray(chart_data['aov'], dtype=np.float32)
             
             # Create figure with dual y-axis
-            fig, ax1 = plt.subplots(figsize=(14, 8))
+            fig = self._reset_figure((14, 8))
+            ax1 = fig.add_subplot(111)
             ax2 = ax1.twinx()
             
             # Orders line (left axis)
             line1 = ax1.plot(dates, orders,
-                            color=self.config.COLORS['positive'],
+                            color=palette['positive'],
                             linewidth=3,
                             marker='s',
                             markersize=7,
                             markerfacecolor='white',
                             markeredgewidth=2,
-                            markeredgecolor=self.config.COLORS['positive'],
+                            markeredgecolor=palette['positive'],
+                            rasterized=True,
                             label='Orders')
             
             # AOV line (right axis)
             line2 = ax2.plot(dates, aov,
-                            color=self.config.COLORS['accent1'],
+                            color=palette['accent1'],
                             linewidth=3,
                             marker='^',
                             markersize=7,
                             markerfacecolor='white',
                             markeredgewidth=2,
-                            markeredgecolor=self.config.COLORS['accent1'],
+                            markeredgecolor=palette['accent1'],
+                            rasterized=True,
                             label='Avg Order Value')
             
             # Formatting
             ax1.set_title('Orders Trend & Average Order Value', 
                          fontsize=18, 
                          fontweight='bold',
-                         color=self.config.COLORS['text_dark'],
+                         color=palette['text_dark'],
                          pad=20)
             
             # Left axis (Orders)
             ax1.set_xlabel('Week', fontsize=14, fontweight='medium')
             ax1.set_ylabel('Number of Orders', fontsize=14, fontweight='medium', 
-                          color=self.config.COLORS['positive'])
-            ax1.tick_params(axis='y', labelcolor=self.config.COLORS['positive'])
+                          color=palette['positive'])
+            ax1.tick_params(axis='y', labelcolor=palette['positive'])
             
             # Right axis (AOV)
-            ax2.set_ylabel(f'Average Order Value ({self.config.METRICS_CONFIG["currency_symbol"]})', 
+            ax2.set_ylabel(f'Average Order Value ({currency})', 
                           fontsize=14, fontweight='medium',
-                          color=self.config.COLORS['accent1'])
-            ax2.tick_params(axis='y', labelcolor=self.config.COLORS['accent1'])
-            ax2.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{self.config.METRICS_CONFIG["currency_symbol"]}{x:,.0f}'))
-            
-            # Format x-axis
-            ax1.xaxis.set_major_formatter(mdates.DateFormatter('%d %b'))
-            ax1.xaxis.set_major_locator(mdates.WeekdayLocator(interval=1))
-            plt.xticks(rotation=45)
-            
-            # Grid
-            ax1.grid(True, alpha=0.3)
-            ax1.set_axisbelow(True)
+                          color=palette['accent1'])
+            ax2.tick_params(axis='y', labelcolor=palette['accent1'])
+            ax2.yaxis.set_major_formatter(self._currency_fmt)
             
             # Combined legend
             lines = line1 + line2
             labels = [l.get_label() for l in lines]
             ax1.legend(lines, labels, loc='upper left', frameon=True, fancybox=True, shadow=True)
             
-            plt.tight_layout()
-            
-            filename = self.charts_dir / 'orders_trend.png'
-            plt.savefig(filename, 
-                       dpi=self.config.CHART_CONFIG['dpi'],
-                       bbox_inches='tight',
-                       facecolor='white',
-                       edgecolor='none')
-            plt.close()
+            filename = self._chart_path('orders_trend')
+            self._finalize_time_axis(ax1, fig, filename)
             
             self.logger.info(f"Orders trend chart created: {filename}")
             return filename
@@ -242,41 +342,33 @@ class ChartGenerator:
     def create_product_analysis_chart(self, chart_data: Dict[str, Any], metrics: Dict[str, Any]) -> Path:
         """Create product performance analysis chart."""
         try:
+            palette = self.config.COLORS
+            
             products = chart_data['products']
-            product_freq = metrics['products']['product_frequency']
+            product_freq = metrics['products']['product_frequency_top']
             
             # Create horizontal bar chart
-            fig, ax = plt.subplots(figsize=(12, 8))
+            fig = self._reset_figure((12, 8))
+            ax = fig.add_subplot(111)
             
             # Prepare data
             product_names = list(product_freq.keys())
             frequencies = list(product_freq.values())
             
-            # Create color palette
-            colors = [self.config.COLORS['primary'], 
-                     self.config.COLORS['positive'],
-                     self.config.COLORS['accent1'],
-                     self.config.COLORS['accent2'],
-                     self.config.COLORS['warning']]
-            bar_colors = colors[:len(product_names)]
+            bar_colors = self._bar_colors[:len(product_names)]
             
             # Create bars
             bars = ax.barh(product_names, frequencies, color=bar_colors, alpha=0.8)
             
             # Add value labels on bars
-            for i, (bar, freq) in enumerate(zip(bars, frequencies)):
-                width = bar.get_width()
-                ax.text(width + 0.1, bar.get_y() + bar.get_height()/2,
-                       f'{freq} weeks',
-                       ha='left', va='center',
-                       fontweight='medium',
-                       fontsize=11)
+            ax.bar_label(bars, labels=[f'{freq} weeks' for freq in frequencies],
+                         padding=3, fontweight='medium', fontsize=11)
             
             # Formatting
             ax.set_title('Top Products Performance Analysis', 
                         fontsize=18, 
                         fontweight='bold',
-                        color=self.config.COLORS['text_dark'],
+                        color=palette['text_dark'],
                         pad=20)
             
             ax.set_xlabel('Weeks as Top Product', fontsize=14, fontweight='medium')
@@ -290,7 +382,7 @@ class ChartGenerator:
             current_product = metrics['products']['current_top_product']
             if current_product in product_names:
                 idx = product_names.index(current_product)
-                bars[idx].set_edgecolor(self.config.COLORS['negative'])
+                bars[idx].set_edgecolor(palette['negative'])
                 bars[idx].set_linewidth(3)
                 # Add star annotation
                 ax.text(frequencies[idx] + 0.5, idx,
@@ -298,17 +390,10 @@ class ChartGenerator:
                        ha='left', va='center',
                        fontweight='bold',
                        fontsize=10,
-                       color=self.config.COLORS['negative'])
+                       color=palette['negative'])
             
-            plt.tight_layout()
-            
-            filename = self.charts_dir / 'product_analysis.png'
-            plt.savefig(filename, 
-                       dpi=self.config.CHART_CONFIG['dpi'],
-                       bbox_inches='tight',
-                       facecolor='white',
-                       edgecolor='none')
-            plt.close()
+            filename = self._chart_path('product_analysis')
+            self._save(fig, filename)
             
             self.logger.info(f"Product analysis chart created: {filename}")
             return filename
@@ -320,16 +405,19 @@ class ChartGenerator:
     def create_customer_analysis_chart(self, chart_data: Dict[str, Any], metrics: Dict[str, Any]) -> Path:
         """Create customer analysis donut chart."""
         try:
-            customer_freq = metrics['customers']['customer_frequency']
+            palette = self.config.COLORS
+            
+            customer_freq = metrics['customers']['customer_frequency_top']
             
-            fig, ax = plt.subplots(figsize=(10, 10))
+            fig = self._reset_figure((10, 10))
+            ax = fig.add_subplot(111)
             
             # Prepare data
             customers = list(customer_freq.keys())
             frequencies = list(customer_freq.values())
             
-            # Create color palette
-            colors = plt.cm.Set3(np.linspace(0, 1, len(customers)))
+            # Set3 has 12 discrete colors; pie cycles them beyond that
+            colors = self._set3[:len(customers)]
             
             # Create donut chart
             wedges, texts, autotexts = ax.pie(frequencies,
@@ -337,23 +425,17 @@ class ChartGenerator:
                                              colors=colors,
                                              autopct='%1.1f%%',
                                              startangle=90,
+                                             textprops=dict(fontsize=12, fontweight='medium'),
                                              wedgeprops=dict(width=0.5, edgecolor='white', linewidth=2))
             
-            # Beautify text
-            for autotext in autotexts:
-                autotext.set_color('white')
-                autotext.set_fontweight('bold')
-                autotext.set_fontsize(11)
-            
-            for text in texts:
-                text.set_fontsize(12)
-                text.set_fontweight('medium')
+            # Percentage labels inside the wedges
+            setp(autotexts, color='white', fontweight='bold', fontsize=11)
             
             # Title
             ax.set_title('Top Customers Distribution', 
                         fontsize=18, 
                         fontweight='bold',
-                        color=self.config.COLORS['text_dark'],
+                        color=palette['text_dark'],
                         pad=20)
             
             # Add center text
@@ -362,22 +444,15 @@ class ChartGenerator:
                    ha='center', va='center',
                    fontsize=14,
                    fontweight='bold',
-                   color=self.config.COLORS['text_dark'],
+                   color=palette['text_dark'],
                    bbox=dict(boxstyle="round,pad=0.3", 
                             facecolor='white', 
-                            edgecolor=self.config.COLORS['primary'],
+                            edgecolor=palette['primary'],
                             linewidth=2))
             
-            plt.axis('equal')
-            plt.tight_layout()
-            
-            filename = self.charts_dir / 'customer_analysis.png'
-            plt.savefig(filename, 
-                       dpi=self.config.CHART_CONFIG['dpi'],
-                       bbox_inches='tight',
-                       facecolor='white',
-                       edgecolor='none')
-            plt.close()
+            ax.axis('equal')
+            filename = self._chart_path('customer_analysis')
+            self._save(fig, filename)
             
             self.logger.info(f"Customer analysis chart created: {filename}")
             return filename
@@ -389,7 +464,9 @@ class ChartGenerator:
     def create_performance_dashboard(self, chart_data: Dict[str, Any], metrics: Dict[str, Any]) -> Path:
         """Create a comprehensive dashboard with multiple metrics."""
         try:
-            fig = plt.figure(figsize=(16, 12))
+            palette = self.config.COLORS
+            
+            fig = self._reset_figure((16, 12))
             
             # Create subplot grid
             gs = fig.add_gridspec(3, 3, height_ratios=[1, 1.5, 1], width_ratios=[1, 1, 1])
@@ -402,18 +479,20 @@ class ChartGenerator:
             ax_orders = fig.add_subplot(gs[1, 2])
             
             # Sales trend
-            dates = pd.to_datetime(chart_data['dates'])
-            sales = chart_data['sales']
+            dates = np.asarray(chart_data['dates'], dtype='datetime64[D]')
+            sales = np.asarray(chart_data['sales'], dtype=np.float32)
             
             ax_sales.plot(dates, sales, 
-                         color=self.config.COLORS['primary'],
-                         linewidth=3, marker='o', markersize=6)
+                         color=palette['primary'],
+                         linewidth=3, marker='o', markersize=6,
+                         rasterized=True)
             ax_sales.set_title('Sales Trend', fontweight='bold')
             ax_sales.grid(True, alpha=0.3)
             
             # Orders bar chart
-            ax_orders.bar(range(len(chart_data['orders'])), chart_data['orders'],
-                         color=self.config.COLORS['positive'], alpha=0.8)
+            orders = np.asarray(chart_data['orders'], dtype=np.float32)
+            ax_orders.bar(np.arange(orders.size), orders,
+                         color=palette['positive'], alpha=0.8)
             ax_orders.set_title('Orders by Week', fontweight='bold')
             ax_orders.grid(True, alpha=0.3)
             
@@ -422,30 +501,25 @@ class ChartGenerator:
             ax_aov = fig.add_subplot(gs[2, 2])
             
             # Product frequency
-            product_freq = metrics['products']['product_frequency']
+            product_freq = metrics['products']['product_frequency_top']
             if product_freq:
                 products = list(product_freq.keys())[:5]  # Top 5
                 freqs = list(product_freq.values())[:5]
-                ax_product.barh(products, freqs, color=self.config.COLORS['accent1'], alpha=0.8)
+                ax_product.barh(products, freqs, color=palette['accent1'], alpha=0.8)
                 ax_product.set_title('Top Products', fontweight='bold')
             
             # AOV trend
-            aov = chart_data['aov']
+            aov = np.asarray(chart_data['aov'], dtype=np.float32)
             ax_aov.plot(range(len(aov)), aov,
-                       color=self.config.COLORS['warning'],
-                       linewidth=2, marker='s', markersize=5)
+                       color=palette['warning'],
+                       linewidth=2, marker='s', markersize=5,
+                       rasterized=True)
             ax_aov.set_title('Avg Order Value', fontweight='bold')
             ax_aov.grid(True, alpha=0.3)
             
-            plt.tight_layout()
-            
-            filename = self.charts_dir / 'performance_dashboard.png'
-            plt.savefig(filename, 
-                       dpi=self.config.CHART_CONFIG['dpi'],
-                       bbox_inches='tight',
-                       facecolor='white',
-                       edgecolor='none')
-            plt.close()
+            # Overview image: rasterized at a lower DPI than the individual charts
+            filename = self._chart_path('performance_dashboard')
+            self._save(fig, filename, dpi=self.config.CHART_CONFIG.get('dashboard_dpi', 100))
             
             self.logger.info(f"Performance dashboard created: {filename}")
             return filename
@@ -456,24 +530,27 @@ class ChartGenerator:
     
     def _create_kpi_cards(self, fig, gs, metrics):
         """Create KPI cards for the dashboard."""
+        palette = self.config.COLORS
+        currency = self.config.METRICS_CONFIG['currency_symbol']
+        
         kpi_data = [
             {
                 'title': 'Weekly Sales',
-                'value': f"{self.config.METRICS_CONFIG['currency_symbol']}{metrics['current_week']['sales']:,.0f}",
+                'value': f"{currency}{metrics['current_week']['sales']:,.0f}",
                 'change': f"{metrics['changes']['sales_change']:+.1f}%",
-                'color': self.config.COLORS['positive'] if metrics['changes']['sales_change'] >= 0 else self.config.COLORS['negative']
+                'color': palette['positive'] if metrics['changes']['sales_change'] >= 0 else palette['negative']
             },
             {
                 'title': 'Weekly Orders', 
                 'value': f"{metrics['current_week']['orders']:,}",
                 'change': f"{metrics['changes']['orders_change']:+.1f}%",
-                'color': self.config.COLORS['positive'] if metrics['changes']['orders_change'] >= 0 else self.config.COLORS['negative']
+                'color': palette['positive'] if metrics['changes']['orders_change'] >= 0 else palette['negative']
             },
             {
                 'title': 'Avg Order Value',
-                'value': f"{self.config.METRICS_CONFIG['currency_symbol']}{metrics['aov']['current']:.0f}",
+                'value': f"{currency}{metrics['aov']['current']:.0f}",
                 'change': f"{metrics['aov']['change']:+.1f}%",
-                'color': self.config.COLORS['positive'] if metrics['aov']['change'] >= 0 else self.config.COLORS['negative']
+                'color': palette['positive'] if metrics['aov']['change'] >= 0 else palette['negative']
             }
         ]
         
@@ -496,38 +573,76 @@ class ChartGenerator:
                 spine.set_linewidth(2)
                 spine.set_edgecolor(kpi['color'])
     
+    def _cache_key(self, chart_data: Dict[str, Any], metrics: Dict[str, Any]) -> str:
+        """Hash the chart inputs so unchanged data can reuse existing files."""
+        payload = json.dumps({'d': chart_data, 'm': metrics}, sort_keys=True,
+                             default=lambda o: o.tolist() if hasattr(o, 'tolist') else str(o))
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+    
+    def _render_charts(self, method_names: List[str], chart_data: Dict[str, Any], metrics: Dict[str, Any]) -> List[Path]:
+        """Run the given chart creators, in worker processes when allowed."""
+        max_workers = self.config.CHART_CONFIG.get('max_workers') or min(len(method_names), os.cpu_count() or 1)
+        
+        if max_workers <= 1:
+            # Sequential path, handy for debugging
+            return [getattr(self, name)(chart_data, metrics) for name in method_names]
+        
+        # Each chart is independent and CPU-bound on rasterization,
+        # so render them in separate processes
+        chart_files = [None] * len(method_names)
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 initializer=_init_chart_worker,
+                                 initargs=(self.config,)) as executor:
+            futures = {
+                executor.submit(_render_chart, name, chart_data, metrics): index
+                for index, name in enumerate(method_names)
+            }
+            for future in as_completed(futures):
+                chart_files[futures[future]] = future.result()
+        return chart_files
+    
     def generate_all_charts(self, chart_data: Dict[str, Any], metrics: Dict[str, Any]) -> List[Path]:
         """Generate all charts and return list of file paths."""
         try:
             self.logger.info("Starting chart generation...")
             
-            chart_files = []
-            
-            # Generate individual charts
-            chart_files.append(self.create_sales_trend_chart(chart_data, metrics))
-            chart_files.append(self.create_orders_trend_chart(chart_data, metrics))
-            chart_files.append(self.create_product_analysis_chart(chart_data, metrics))
-            chart_files.append(self.create_customer_analysis_chart(chart_data, metrics))
-            chart_files.append(self.create_performance_dashboard(chart_data, metrics))
-            
-            self.logger.info(f"Generated {len(chart_files)} charts successfully")
+            key = self._cache_key(chart_data, metrics)
+            method_names = list(CHART_METHODS)
+            save_format = self.config.CHART_CONFIG['save_format']
+            chart_files = [self.charts_dir / f'{stem}.{key}.{save_format}' for stem in CHART_METHODS.values()]
+            
+            # Only render charts whose inputs changed since the last run
+            pending = []
+            for index, chart_file in enumerate(chart_files):
+                if chart_file.exists():
+                    os.utime(chart_file)  # Keep cached charts clear of cleanup
+                else:
+                    pending.append(index)
+            
+            if pending:
+                rendered = self._render_charts([method_names[i] for i in pending], chart_data, metrics)
+                for index, chart_file in zip(pending, rendered):
+                    chart_file.replace(chart_files[index])
+            
+            self.logger.info(f"Generated {len(pending)} charts successfully "
+                             f"({len(chart_files) - len(pending)} reused from cache)")
             return chart_files
             
         except Exception as e:
             self.logger.error(f"Error generating charts: {e}")
             raise
     
-    def cleanup_old_charts(self, keep_days: int = 7):
+    def cleanup_old_charts(self, keep_days: int = 30):
         """Remove old chart files to save space."""
         try:
-            from datetime import datetime, timedelta
-            cutoff_date = datetime.now() - timedelta(days=keep_days)
+            cutoff = (datetime.now() - timedelta(days=keep_days)).timestamp()
             
             removed_count = 0
-            for chart_file in self.charts_dir.glob('*.png'):
-                if chart_file.stat().st_mtime < cutoff_date.timestamp():
-                    chart_file.unlink()
-                    removed_count += 1
+            with os.scandir(self.charts_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(CHART_EXTENSIONS) and entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                        removed_count += 1
             
             if removed_count > 0:
                 self.logger.info(f"Cleaned up {removed_count} old chart files")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Chart Numerics Module
+Fused numerical helpers used to prepare chart data.
+"""
+
+import numpy as np
+from typing import Tuple
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _trend_and_average(s):
+        n = s.size
+        sx = 0.0
+        sy = 0.0
+        sxx = 0.0
+        sxy = 0.0
+        for i in range(n):
+            x = float(i)
+            y = s[i]
+            sx += x
+            sy += y
+            sxx += x * x
+            sxy += x * y
+
+        mean = sy / n if n > 0 else 0.0
+        denom = n * sxx - sx * sx
+        slope = (n * sxy - sx * sy) / denom if n > 1 and denom != 0.0 else 0.0
+        intercept = (sy - slope * sx) / n if n > 0 else 0.0
+
+        trend = np.empty(n)
+        for i in range(n):
+            trend[i] = slope * i + intercept
+        return slope, intercept, trend, mean
+else:
+    def _trend_and_average(s):
+        n = s.size
+        if n == 0:
+            return 0.0, 0.0, np.empty(0), 0.0
+        x = np.arange(n, dtype=np.float64)
+        mean = s.mean()
+        if n < 2:
+            return 0.0, mean, np.full(n, mean), mean
+        x_mean = x.mean()
+        slope = ((x - x_mean) * (s - mean)).sum() / ((x - x_mean) ** 2).sum()
+        intercept = mean - slope * x_mean
+        return slope, intercept, slope * x + intercept, mean
+
+def trend_and_average(sales) -> Tuple[float, float, np.ndarray, float]:
+    """Return (slope, intercept, trend line, mean) of a series in one pass."""
+    return _trend_and_average(np.ascontiguousarray(sales, dtype=np.float64))
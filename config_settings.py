@@ -4,9 +4,31 @@ Configuration settings for the Automated Report Generator System
 """
 
 import os
+import time
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 
+class _DerivedSetting:
+    """Class attribute built lazily from a parent's dict setting plus overrides.
+    
+    The merged dict is created on first access and then stored on the owning
+    class, so later lookups are plain attribute reads.
+    """
+    
+    def __init__(self, **overrides):
+        self.overrides = overrides
+    
+    def __set_name__(self, owner, name):
+        self.owner = owner  # The defining class; lookups may come through a subclass
+        self.name = name
+    
+    def __get__(self, instance, owner):
+        base = getattr(super(self.owner, self.owner), self.name)
+        value = {**base, **self.overrides}
+        setattr(self.owner, self.name, value)
+        return value
+
 class Config:
     """Main configuration class for the report system."""
     
@@ -22,10 +44,13 @@ class Config:
     CHARTS_DIR = BASE_DIR / "charts"
     TEMPLATES_DIR = BASE_DIR / "templates"
     LOGS_DIR = BASE_DIR / "logs"
+    CACHE_DIR = BASE_DIR / "cache"
+    
+    # Set once the directories above have been created (see ensure_dirs)
+    _dirs_ready = False
     
-    # Create directories if they don't exist
-    for directory in [DATA_DIR, OUTPUT_DIR, CHARTS_DIR, TEMPLATES_DIR, LOGS_DIR]:
-        directory.mkdir(exist_ok=True)
+    # Seconds a validate_config() result is reused before re-checking the filesystem
+    VALIDATION_TTL = 5
     
     # Report Configuration
     REPORT_FORMATS = ['pdf', 'html', 'excel']
@@ -61,18 +86,27 @@ class Config:
             'team@company.com'
         ],
         'subject_template': "Weekly Business Report - {date_range}",
-        'send_reports': False  # Set to True to enable email sending
+        'send_reports': False,  # Set to True to enable email sending
+        'max_recipients_per_message': 50,  # Larger lists are split and sent as BCC batches
+        'max_emails_per_connection': 100,  # Reconnect after this many messages on one session
+        'max_connections': 4,  # Worker threads (and pooled SMTP sessions) for async sends
+        'include_text_alternative': True,  # Plain-text part for text-only clients; False sends HTML only
+        'attachment_mode': 'inline',  # 'inline', 'gzip' (compressed PDF) or 'link' (download links, no attachments)
+        'attachment_base_url': os.getenv('REPORTS_BASE_URL', '')  # Where the project's reports/charts folders are published ('link' mode)
     }
     
     # Chart Configuration
     CHART_CONFIG = {
         'figure_size': (12, 8),
         'dpi': 300,
+        'dashboard_dpi': 100,  # Lower resolution for the large overview dashboard
         'style': 'seaborn-v0_8-whitegrid',
         'font_size': 11,
         'title_size': 16,
         'label_size': 12,
-        'save_format': 'png'
+        'save_format': 'png',  # 'png' or 'webp' (smaller lossless files, faster encode)
+        'png_compress_level': 3,  # zlib level for PNG output (lower = faster encode, slightly larger files)
+        'max_workers': None  # Chart worker processes (None = one per chart, capped by CPU count; 1 = sequential)
     }
     
     # Color Palette
@@ -111,6 +145,7 @@ class Config:
         'decimal_places': 2,
         'percentage_decimal_places': 1,
         'large_number_format': '{:,.0f}',  # Format large numbers with commas
+        'top_k': 10,  # Products/customers kept in the frequency breakdowns
         'growth_threshold': {
             'high': 10,  # Above 10% is high growth
             'medium': 5,  # 5-10% is medium growth
@@ -174,9 +209,20 @@ class Config:
         'enable_ai_insights': False,  # Future: AI-powered insights
         'minimum_data_points': 2,     # Minimum weeks needed for trend analysis
         'seasonal_analysis': False,   # Enable seasonal pattern detection
-        'competitor_comparison': False # Enable if competitor data available
+        'competitor_comparison': False, # Enable if competitor data available
+        'disk_cache': False,  # Persist generated insights under CACHE_DIR/insights across runs
+        'disk_cache_max_bytes': 50 * 1024 * 1024  # Oldest entries are evicted beyond this size
     }
 
+    @classmethod
+    def ensure_dirs(cls):
+        """Create the working directories on first use instead of at import time."""
+        if Config._dirs_ready:
+            return
+        for directory in (cls.DATA_DIR, cls.OUTPUT_DIR, cls.CHARTS_DIR, cls.TEMPLATES_DIR, cls.LOGS_DIR):
+            directory.mkdir(exist_ok=True)
+        Config._dirs_ready = True
+    
     @classmethod
     def get_current_week_range(cls):
         """Get the current week date range for reports."""
@@ -194,7 +240,25 @@ class Config:
     
     @classmethod
     def validate_config(cls):
-        """Validate configuration settings."""
+        """Validate configuration settings.
+        
+        Results are memoized per distinct settings for up to VALIDATION_TTL
+        seconds, so filesystem checks are not repeated on every call.
+        """
+        email_config = cls.EMAIL_CONFIG
+        ttl_bucket = int(time.time()) // cls.VALIDATION_TTL
+        return list(_cached_validation(cls, cls.CSV_FILE_PATH, email_config['send_reports'],
+                                       email_config['sender_email'],
+                                       tuple(email_config['recipients']), ttl_bucket))
+    
+    @classmethod
+    def invalidate_validation(cls):
+        """Drop memoized validation results (e.g. after creating files in tests)."""
+        _cached_validation.cache_clear()
+    
+    @classmethod
+    def _collect_config_errors(cls):
+        """Run the configuration checks and return a list of error messages."""
         errors = []
         
         # Check required directories exist
@@ -208,6 +272,8 @@ class Config:
                 errors.append("Sender email not configured")
             if not cls.EMAIL_CONFIG['recipients']:
                 errors.append("No email recipients configured")
+            if cls.EMAIL_CONFIG['attachment_mode'] == 'link' and not cls.EMAIL_CONFIG['attachment_base_url']:
+                errors.append("Attachment base URL not configured for 'link' attachment mode")
         
         # Check data source configuration
         if cls.DATA_SOURCE_TYPE == 'csv' and not cls.CSV_FILE_PATH.exists():
@@ -218,23 +284,29 @@ class Config:
 # Development/Testing Configuration
 class DevelopmentConfig(Config):
     """Configuration for development environment."""
-    LOGGING_CONFIG = Config.LOGGING_CONFIG.copy()
-    LOGGING_CONFIG['level'] = 'DEBUG'
-    EMAIL_CONFIG = Config.EMAIL_CONFIG.copy()
-    EMAIL_CONFIG['send_reports'] = False
+    LOGGING_CONFIG = _DerivedSetting(level='DEBUG')
+    EMAIL_CONFIG = _DerivedSetting(send_reports=False)
     
 # Production Configuration  
 class ProductionConfig(Config):
     """Configuration for production environment."""
-    LOGGING_CONFIG = Config.LOGGING_CONFIG.copy()
-    LOGGING_CONFIG['level'] = 'INFO'
-    AUTOMATION_CONFIG = Config.AUTOMATION_CONFIG.copy()
-    AUTOMATION_CONFIG['schedule_enabled'] = True
+    LOGGING_CONFIG = _DerivedSetting(level='INFO')
+    AUTOMATION_CONFIG = _DerivedSetting(schedule_enabled=True)
+
+@lru_cache(maxsize=64)
+def _cached_validation(config_cls, csv_path, send_reports, sender_email, recipients, ttl_bucket):
+    """Memoized validation keyed on the settings the checks depend on."""
+    return tuple(config_cls._collect_config_errors())
 
 # Get configuration based on environment
+@lru_cache(maxsize=1)
 def get_config():
-    """Return appropriate configuration based on environment."""
+    """Return appropriate configuration based on environment.
+    
+    The result is cached per process; call get_config.cache_clear() to pick up
+    a changed FLASK_ENV (e.g. in tests).
+    """
     env = os.getenv('FLASK_ENV', 'development')
-    if env == 'production':
-        return ProductionConfig()
-    return DevelopmentConfig()
+    config_cls = ProductionConfig if env == 'production' else DevelopmentConfig
+    config_cls.ensure_dirs()
+    return config_cls()
@@ -11,8 +11,49 @@ import logging
 from typing import Dict, List, Optional, Tuple, Any
 from pathlib import Path
 import json
+import contextlib
+from collections import Counter
 
 from config import get_config
+from metrics_kernels import TrendStats, compute_trend_stats
+
+def _copy_on_write():
+    """Context enabling copy-on-write while cleaning, so derived frames share buffers with self.data.
+    
+    Scoped rather than set globally, so other pandas users in the process are unaffected;
+    pandas 3 always copies on write and has dropped the option.
+    """
+    if int(pd.__version__.split('.')[0]) >= 3:
+        return contextlib.nullcontext()
+    return pd.option_context('mode.copy_on_write', True)
+
+# Columns parsed as dates and explicit dtypes for the weekly report CSV
+DATE_COLUMNS = ['Week_Start', 'Week_End']
+CSV_DTYPES = {'Total_Sales': 'float64'}
+
+# Files estimated above CLEAN_CHUNK_ROWS rows are read and pre-cleaned in batches
+CLEAN_CHUNK_ROWS = 5000
+APPROX_ROW_BYTES = 64  # Typical size of one weekly record in the CSV
+
+# Buffered CSV export settings
+EXPORT_BUFFER_SIZE = 1 << 20  # 1 MiB
+EXPORT_CHUNK_ROWS = 10000
+
+# Required input columns and the kind of data each must hold
+REQUIRED_SCHEMA = {
+    'Week_Start': 'datetime-like',
+    'Week_End': 'datetime-like',
+    'Total_Sales': 'numeric',
+    'Total_Orders': 'numeric',
+    'Top_Product': 'string',
+    'Top_Customer': 'string'
+}
+
+_SCHEMA_CHECKS = {
+    'datetime-like': lambda s: pd.api.types.is_datetime64_any_dtype(s) or pd.api.types.is_object_dtype(s),
+    'numeric': pd.api.types.is_numeric_dtype,
+    'string': lambda s: pd.api.types.is_string_dtype(s) or pd.api.types.is_object_dtype(s)
+}
 
 class DataProcessor:
     """Handles all data processing operations for the report system."""
@@ -23,46 +64,115 @@ class DataProcessor:
         self.logger = logging.getLogger(__name__)
         self.data = None
         self.processed_data = None
+        # Derived results memoized for the current processed_data (see _memoized)
+        self._cache = {}
+        self._cache_source = None
+        
+    def _read_csv(self, source) -> pd.DataFrame:
+        """Read report CSV data, parsing dates in the same pass."""
+        if isinstance(source, (str, Path)) and Path(source).stat().st_size > CLEAN_CHUNK_ROWS * APPROX_ROW_BYTES:
+            return self._read_csv_batched(source)
         
+        try:
+            return pd.read_csv(source, engine='pyarrow',
+                               parse_dates=DATE_COLUMNS, dtype=CSV_DTYPES)
+        except ImportError:
+            # pyarrow not installed; fall back to the default C parser
+            if hasattr(source, 'seek'):
+                source.seek(0)
+            return pd.read_csv(source, parse_dates=DATE_COLUMNS, dtype=CSV_DTYPES)
+    
+    def _read_csv_batched(self, path) -> pd.DataFrame:
+        """Read a long history in row batches, pre-cleaning each batch before concatenating."""
+        reader = pd.read_csv(path, chunksize=CLEAN_CHUNK_ROWS,
+                             parse_dates=DATE_COLUMNS, dtype=CSV_DTYPES)
+        chunks = [self._clean_chunk(chunk) for chunk in reader]
+        self.logger.debug(f"Read {path} in {len(chunks)} batches")
+        return pd.concat(chunks, ignore_index=True, copy=False)
+    
+    def _clean_chunk(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Batch-local cleaning; sorting, interpolation and de-duplication stay global in clean_data."""
+        for col in ('Top_Product', 'Top_Customer'):
+            if col in chunk and chunk[col].isnull().any():
+                chunk[col] = chunk[col].fillna('Unknown')
+                self.logger.warning(f"Missing values in {col} filled with 'Unknown'")
+        return chunk
+    
     def load_data_from_csv(self, file_path: Optional[Path] = None, csv_content: Optional[str] = None) -> pd.DataFrame:
         """Load data from CSV file or string content."""
         try:
             if csv_content:
                 # Load from string content (for demo/testing)
                 from io import StringIO
-                self.data = pd.read_csv(StringIO(csv_content))
+                self.data = self._read_csv(StringIO(csv_content))
                 self.logger.info("Data loaded from string content")
             elif file_path:
-                self.data = pd.read_csv(file_path)
+                self.data = self._read_csv(file_path)
                 self.logger.info(f"Data loaded from {file_path}")
             else:
                 # Use default CSV path
                 default_path = self.config.CSV_FILE_PATH
                 if default_path.exists():
-                    self.data = pd.read_csv(default_path)
+                    self.data = self._read_csv(default_path)
                     self.logger.info(f"Data loaded from default path: {default_path}")
                 else:
                     raise FileNotFoundError(f"CSV file not found: {default_path}")
             
+            # Fail fast on malformed input before any cleaning work
+            self._check_schema(self.data)
+            
             return self.data
             
         except Exception as e:
             self.logger.error(f"Error loading CSV data: {e}")
             raise
     
+    def _check_schema(self, data: pd.DataFrame):
+        """Check the raw data against REQUIRED_SCHEMA; raise ValueError listing all problems."""
+        missing = [col for col in REQUIRED_SCHEMA if col not in data.columns]
+        if missing:
+            raise ValueError(f"Input data is missing required columns: {', '.join(missing)}")
+        
+        errors = [f"{col}: expected {kind}, got {data[col].dtype}"
+                  for col, kind in REQUIRED_SCHEMA.items()
+                  if not _SCHEMA_CHECKS[kind](data[col])]
+        if errors:
+            raise ValueError("Input data schema mismatch: " + "; ".join(errors))
+        
+        for col in ('Total_Sales', 'Total_Orders'):
+            if (data[col] < 0).any():
+                raise ValueError(f"{col}: expected non-negative values")
+    
     def load_sample_data(self) -> pd.DataFrame:
-        """Load the sample business data for demonstration."""
-        sample_data = """Week_Start,Week_End,Total_Sales,Total_Orders,Top_Product,Top_Customer
-2025-01-06,2025-01-12,12500,45,Laptop,Alpha Corp
-2025-01-13,2025-01-19,15800,52,Smartphone,Beta Ltd
-2025-01-20,2025-01-26,14200,48,Tablet,Gamma LLC
-2025-01-27,2025-02-02,16950,55,Monitor,Delta Inc
-2025-02-03,2025-02-09,18100,60,Printer,Epsilon Co
-2025-02-10,2025-02-16,17500,57,Keyboard,Zeta Enterprises
-2025-02-17,2025-02-23,19000,62,Mouse,Eta Traders
-2025-02-24,2025-03-02,20050,65,Headphones,Theta Solutions"""
+        """Load the sample business data for demonstration.
+        
+        Equivalent CSV:
         
-        return self.load_data_from_csv(csv_content=sample_data)
+            Week_Start,Week_End,Total_Sales,Total_Orders,Top_Product,Top_Customer
+            2025-01-06,2025-01-12,12500,45,Laptop,Alpha Corp
+            2025-01-13,2025-01-19,15800,52,Smartphone,Beta Ltd
+            2025-01-20,2025-01-26,14200,48,Tablet,Gamma LLC
+            2025-01-27,2025-02-02,16950,55,Monitor,Delta Inc
+            2025-02-03,2025-02-09,18100,60,Printer,Epsilon Co
+            2025-02-10,2025-02-16,17500,57,Keyboard,Zeta Enterprises
+            2025-02-17,2025-02-23,19000,62,Mouse,Eta Traders
+            2025-02-24,2025-03-02,20050,65,Headphones,Theta Solutions
+        """
+        # Built directly from columns; no CSV parser round-trip
+        week_starts = pd.date_range('2025-01-06', periods=8, freq='7D')
+        self.data = pd.DataFrame({
+            'Week_Start': week_starts,
+            'Week_End': week_starts + pd.Timedelta(days=6),
+            'Total_Sales': np.array([12500, 15800, 14200, 16950, 18100, 17500, 19000, 20050], dtype=np.float64),
+            'Total_Orders': np.array([45, 52, 48, 55, 60, 57, 62, 65], dtype=np.int64),
+            'Top_Product': ['Laptop', 'Smartphone', 'Tablet', 'Monitor',
+                            'Printer', 'Keyboard', 'Mouse', 'Headphones'],
+            'Top_Customer': ['Alpha Corp', 'Beta Ltd', 'Gamma LLC', 'Delta Inc',
+                             'Epsilon Co', 'Zeta Enterprises', 'Eta Traders', 'Theta Solutions']
+        })
+        self.logger.info("Sample data loaded")
+        
+        return self.data
     
     def clean_data(self) -> pd.DataFrame:
         """Clean and prepare the data for analysis."""
@@ -70,40 +180,44 @@ class DataProcessor:
             raise ValueError("No data loaded. Call load_data_from_csv() first.")
         
         try:
-            # Create a copy for processing
-            cleaned_data = self.data.copy()
-            
-            # Convert date columns to datetime
-            cleaned_data['Week_Start'] = pd.to_datetime(cleaned_data['Week_Start'])
-            cleaned_data['Week_End'] = pd.to_datetime(cleaned_data['Week_End'])
-            
-            # Sort by week start date
-            cleaned_data = cleaned_data.sort_values('Week_Start')
-            
-            # Handle missing values
-            numeric_columns = ['Total_Sales', 'Total_Orders']
-            for col in numeric_columns:
-                if cleaned_data[col].isnull().any():
-                    # Fill missing numeric values with interpolation
-                    cleaned_data[col] = cleaned_data[col].interpolate()
-                    self.logger.warning(f"Missing values in {col} filled using interpolation")
-            
-            # Fill missing categorical values
-            categorical_columns = ['Top_Product', 'Top_Customer']
-            for col in categorical_columns:
-                if cleaned_data[col].isnull().any():
-                    cleaned_data[col] = cleaned_data[col].fillna('Unknown')
-                    self.logger.warning(f"Missing values in {col} filled with 'Unknown'")
-            
-            # Remove duplicates
-            initial_count = len(cleaned_data)
-            cleaned_data = cleaned_data.drop_duplicates(subset=['Week_Start'])
-            if len(cleaned_data) < initial_count:
-                self.logger.warning(f"Removed {initial_count - len(cleaned_data)} duplicate records")
+            with _copy_on_write():
+                # Parse dates (if not already parsed at load) and sort in one chain;
+                # with copy-on-write, assign() shares unchanged columns with self.data
+                data = self.data
+                date_updates = {col: pd.to_datetime(data[col]) for col in DATE_COLUMNS
+                                if not pd.api.types.is_datetime64_any_dtype(data[col])}
+                cleaned_data = data.assign(**date_updates).sort_values('Week_Start')
+                
+                # Handle missing values, scanning all value columns once
+                numeric_columns = ['Total_Sales', 'Total_Orders']
+                categorical_columns = ['Top_Product', 'Top_Customer']
+                null_columns = cleaned_data[numeric_columns + categorical_columns].isnull().any()
+                if null_columns.any():
+                    for col in numeric_columns:
+                        if null_columns[col]:
+                            # Fill missing numeric values with interpolation
+                            cleaned_data[col] = cleaned_data[col].interpolate()
+                            self.logger.warning(f"Missing values in {col} filled using interpolation")
+                    
+                    for col in categorical_columns:
+                        if null_columns[col]:
+                            cleaned_data[col] = cleaned_data[col].fillna('Unknown')
+                            self.logger.warning(f"Missing values in {col} filled with 'Unknown'")
+                
+                # Low-cardinality names: store as integer codes plus a category table (in first-appearance order)
+                for col in categorical_columns:
+                    cleaned_data[col] = cleaned_data[col].astype(pd.CategoricalDtype(pd.unique(cleaned_data[col])))
+                
+                # Remove duplicates
+                initial_count = len(cleaned_data)
+                cleaned_data = cleaned_data[~cleaned_data['Week_Start'].duplicated()]
+                if len(cleaned_data) < initial_count:
+                    self.logger.warning(f"Removed {initial_count - len(cleaned_data)} duplicate records")
             
             # Validate data integrity
             self._validate_data_integrity(cleaned_data)
             
+            self._cache.clear()
             self.processed_data = cleaned_data
             self.logger.info(f"Data cleaned successfully. {len(cleaned_data)} records processed.")
             
@@ -129,18 +243,33 @@ class DataProcessor:
         if not date_issues.empty:
             raise ValueError("Data contains weeks where end date is before start date")
     
+    def _memoized(self, key: str, compute):
+        """Return a result cached for the current processed data, computing it once."""
+        if self._cache_source is not self.processed_data:
+            self._cache.clear()
+            self._cache_source = self.processed_data
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+    
     def calculate_metrics(self) -> Dict[str, Any]:
         """Calculate comprehensive business metrics."""
         if self.processed_data is None:
             raise ValueError("No processed data available. Call clean_data() first.")
         
+        return self._memoized('metrics', self._compute_metrics)
+    
+    def _compute_metrics(self) -> Dict[str, Any]:
+        """Compute the metrics returned by calculate_metrics."""
         try:
             data = self.processed_data
             metrics = {}
             
             # Current period (latest week) metrics
-            latest_week = data.iloc[-1]
-            previous_week = data.iloc[-2] if len(data) > 1 else latest_week
+            # Materialize only the last two rows, as plain dicts
+            last_rows = data.tail(2).to_dict('records')
+            latest_week = last_rows[-1]
+            previous_week = last_rows[0]  # Same as latest_week when only one week exists
             
             # Basic metrics
             metrics['current_week'] = {
@@ -205,56 +334,86 @@ class DataProcessor:
             return 100.0 if current > 0 else 0.0
         return ((current - previous) / previous) * 100
     
+    def _aggregate_numeric(self) -> pd.DataFrame:
+        """Aggregate sales and orders in one pass, cached for the current data."""
+        return self._memoized('aggregates', lambda: self.processed_data[['Total_Sales', 'Total_Orders']]
+                              .agg(['sum', 'mean', 'max', 'min', 'std']))
+    
+    def _trend_stats(self) -> TrendStats:
+        """Slope, volatility and CAGR of sales and orders from the fused kernel, cached."""
+        return self._memoized('trend_stats', lambda: compute_trend_stats(
+            self.processed_data['Total_Sales'].to_numpy(),
+            self.processed_data['Total_Orders'].to_numpy()))
+    
     def _calculate_historical_metrics(self, data: pd.DataFrame) -> Dict[str, Any]:
         """Calculate historical metrics and aggregations."""
+        agg = self._aggregate_numeric()
+        stats = self._trend_stats()
+        sales = agg['Total_Sales']
+        orders = agg['Total_Orders']
+        
         return {
-            'total_sales': float(data['Total_Sales'].sum()),
-            'total_orders': int(data['Total_Orders'].sum()),
-            'average_weekly_sales': float(data['Total_Sales'].mean()),
-            'average_weekly_orders': float(data['Total_Orders'].mean()),
-            'max_weekly_sales': float(data['Total_Sales'].max()),
-            'min_weekly_sales': float(data['Total_Sales'].min()),
-            'sales_std_dev': float(data['Total_Sales'].std()),
+            'total_sales': float(sales['sum']),
+            'total_orders': int(orders['sum']),
+            'average_weekly_sales': float(sales['mean']),
+            'average_weekly_orders': float(orders['mean']),
+            'max_weekly_sales': float(sales['max']),
+            'min_weekly_sales': float(sales['min']),
+            'sales_std_dev': float(sales['std']),
             'weeks_count': len(data),
-            'sales_growth_rate': self._calculate_growth_rate(data, 'Total_Sales'),
-            'orders_growth_rate': self._calculate_growth_rate(data, 'Total_Orders')
+            'sales_growth_rate': float(stats.sales_cagr),
+            'orders_growth_rate': float(stats.orders_cagr)
         }
     
-    def _calculate_growth_rate(self, data: pd.DataFrame, column: str) -> float:
-        """Calculate compound average growth rate."""
-        if len(data) < 2:
-            return 0.0
-        
-        first_value = data[column].iloc[0]
-        last_value = data[column].iloc[-1]
-        periods = len(data) - 1
+    def _value_counts(self, column: str) -> List[Tuple[Any, int]]:
+        """(value, count) pairs for a column, most frequent first, cached for the current data."""
+        return self._memoized(f'counts:{column}', lambda: self._count_values(self.processed_data[column]))
+    
+    def _count_values(self, values: pd.Series) -> List[Tuple[Any, int]]:
+        """Count values, using a bincount over the codes for categorical columns."""
+        if not isinstance(values.dtype, pd.CategoricalDtype):
+            return Counter(values.to_numpy()).most_common()
         
-        if first_value <= 0:
-            return 0.0
+        codes = values.cat.codes.to_numpy()
+        codes = codes[codes >= 0]
+        categories = values.cat.categories
+        counts = np.bincount(codes, minlength=len(categories))
         
-        growth_rate = ((last_value / first_value) ** (1 / periods) - 1) * 100
-        return float(growth_rate)
+        # Break ties by first appearance, as value_counts and Counter.most_common do
+        present, first_index = np.unique(codes, return_index=True)
+        first_seen = np.full(len(categories), codes.size)
+        first_seen[present] = first_index
+        order = np.lexsort((first_seen, -counts))
+        return [(str(categories[i]), int(counts[i])) for i in order if counts[i] > 0]
+    
+    def get_full_frequency(self, column: str) -> Dict[str, int]:
+        """Full frequency breakdown for 'Top_Product' or 'Top_Customer', most frequent first."""
+        if self.processed_data is None:
+            raise ValueError("No processed data available.")
+        return dict(self._value_counts(column))
     
     def _analyze_products(self, data: pd.DataFrame) -> Dict[str, Any]:
         """Analyze product performance."""
-        product_counts = data['Top_Product'].value_counts()
+        product_counts = self._value_counts('Top_Product')
+        top_k = self.config.METRICS_CONFIG['top_k']
         
         return {
-            'most_frequent_top_product': str(product_counts.index[0]) if not product_counts.empty else 'None',
-            'product_frequency': product_counts.to_dict(),
+            'most_frequent_top_product': str(product_counts[0][0]) if product_counts else 'None',
+            'product_frequency_top': dict(product_counts[:top_k]),
             'unique_products_count': len(product_counts),
-            'current_top_product': str(data.iloc[-1]['Top_Product'])
+            'current_top_product': str(data['Top_Product'].iat[-1])
         }
     
     def _analyze_customers(self, data: pd.DataFrame) -> Dict[str, Any]:
         """Analyze customer performance."""
-        customer_counts = data['Top_Customer'].value_counts()
+        customer_counts = self._value_counts('Top_Customer')
+        top_k = self.config.METRICS_CONFIG['top_k']
         
         return {
-            'most_frequent_top_customer': str(customer_counts.index[0]) if not customer_counts.empty else 'None',
-            'customer_frequency': customer_counts.to_dict(),
+            'most_frequent_top_customer': str(customer_counts[0][0]) if customer_counts else 'None',
+            'customer_frequency_top': dict(customer_counts[:top_k]),
             'unique_customers_count': len(customer_counts),
-            'current_top_customer': str(data.iloc[-1]['Top_Customer'])
+            'current_top_customer': str(data['Top_Customer'].iat[-1])
         }
     
     def _calculate_trends(self, data: pd.DataFrame) -> Dict[str, Any]:
@@ -262,18 +421,14 @@ class DataProcessor:
         if len(data) < 3:
             return {'status': 'insufficient_data'}
         
-        # Calculate moving averages
-        data_copy = data.copy()
-        data_copy['sales_ma3'] = data_copy['Total_Sales'].rolling(window=3).mean()
-        data_copy['orders_ma3'] = data_copy['Total_Orders'].rolling(window=3).mean()
-        
-        # Trend direction (simple linear trend)
-        sales_trend = np.polyfit(range(len(data)), data['Total_Sales'], 1)[0]
-        orders_trend = np.polyfit(range(len(data)), data['Total_Orders'], 1)[0]
+        # Trend direction (least-squares slope) and volatility (coefficient of variation)
+        stats = self._trend_stats()
+        sales_trend, orders_trend = stats.sales_slope, stats.orders_slope
+        sales_cv, orders_cv = stats.sales_cv, stats.orders_cv
         
-        # Volatility (coefficient of variation)
-        sales_cv = data['Total_Sales'].std() / data['Total_Sales'].mean()
-        orders_cv = data['Total_Orders'].std() / data['Total_Orders'].mean()
+        # Latest 3-week moving averages (the last rolling window is just the tail)
+        sales_ma3 = data['Total_Sales'].to_numpy()[-3:].mean()
+        orders_ma3 = data['Total_Orders'].to_numpy()[-3:].mean()
         
         return {
             'sales_trend_slope': float(sales_trend),
@@ -282,8 +437,8 @@ class DataProcessor:
             'orders_trend_direction': 'increasing' if orders_trend > 0 else 'decreasing' if orders_trend < 0 else 'stable',
             'sales_volatility': float(sales_cv),
             'orders_volatility': float(orders_cv),
-            'latest_ma3_sales': float(data_copy['sales_ma3'].iloc[-1]) if not pd.isna(data_copy['sales_ma3'].iloc[-1]) else 0,
-            'latest_ma3_orders': float(data_copy['orders_ma3'].iloc[-1]) if not pd.isna(data_copy['orders_ma3'].iloc[-1]) else 0
+            'latest_ma3_sales': float(sales_ma3) if not pd.isna(sales_ma3) else 0,
+            'latest_ma3_orders': float(orders_ma3) if not pd.isna(orders_ma3) else 0
         }
     
     def get_data_for_charts(self) -> Dict[str, Any]:
@@ -291,16 +446,30 @@ class DataProcessor:
         if self.processed_data is None:
             raise ValueError("No processed data available.")
         
+        return self._memoized('chart_data', self._build_chart_data)
+    
+    def _build_chart_data(self) -> Dict[str, Any]:
+        """Build the dict returned by get_data_for_charts."""
         data = self.processed_data
         
+        # Numeric series stay as NumPy arrays; matplotlib consumes them directly
+        sales = data['Total_Sales'].to_numpy(dtype=np.float64)
+        orders = data['Total_Orders'].to_numpy(dtype=np.float64)
+        if not np.isnan(orders).any():  # NaN interpolation could not fill (e.g. leading) has no int64 form
+            orders = orders.astype(np.int64)
+        
+        # ISO dates are formatted in C by NumPy; '%d %b' needs month names, so
+        # it stays on pandas strftime (computed once, as the result is memoized)
+        week_starts = data['Week_Start']
+        
         return {
-            'dates': data['Week_Start'].dt.strftime('%Y-%m-%d').tolist(),
-            'formatted_dates': data['Week_Start'].dt.strftime('%d %b').tolist(),
-            'sales': data['Total_Sales'].tolist(),
-            'orders': data['Total_Orders'].tolist(),
+            'dates': np.datetime_as_string(week_starts.to_numpy(), unit='D'),
+            'formatted_dates': week_starts.dt.strftime('%d %b').to_numpy(dtype=str),
+            'sales': sales,
+            'orders': orders,
             'products': data['Top_Product'].tolist(),
             'customers': data['Top_Customer'].tolist(),
-            'aov': (data['Total_Sales'] / data['Total_Orders']).tolist()
+            'aov': sales / np.maximum(orders, 1)
         }
     
     def export_processed_data(self, file_path: Optional[Path] = None) -> Path:
@@ -312,7 +481,9 @@ class DataProcessor:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             file_path = self.config.DATA_DIR / f"processed_data_{timestamp}.csv"
         
-        self.processed_data.to_csv(file_path, index=False)
+        # Large buffer + chunked formatting keeps write syscalls few on long histories
+        with open(file_path, 'w', buffering=EXPORT_BUFFER_SIZE, newline='') as f:
+            self.processed_data.to_csv(f, index=False, chunksize=EXPORT_CHUNK_ROWS)
         self.logger.info(f"Processed data exported to {file_path}")
         
         return file_path
@@ -322,7 +493,12 @@ class DataProcessor:
         if self.processed_data is None:
             return {'status': 'no_data'}
         
+        return self._memoized('summary', self._build_data_summary)
+    
+    def _build_data_summary(self) -> Dict[str, Any]:
+        """Build the dict returned by get_data_summary."""
         data = self.processed_data
+        agg = self._aggregate_numeric()
         
         return {
             'total_records': len(data),
@@ -334,13 +510,13 @@ class DataProcessor:
             'data_types': data.dtypes.to_dict(),
             'missing_values': data.isnull().sum().to_dict(),
             'sales_range': {
-                'min': float(data['Total_Sales'].min()),
-                'max': float(data['Total_Sales'].max()),
-                'mean': float(data['Total_Sales'].mean())
+                'min': float(agg.at['min', 'Total_Sales']),
+                'max': float(agg.at['max', 'Total_Sales']),
+                'mean': float(agg.at['mean', 'Total_Sales'])
             },
             'orders_range': {
-                'min': int(data['Total_Orders'].min()),
-                'max': int(data['Total_Orders'].max()),
-                'mean': float(data['Total_Orders'].mean())
+                'min': int(agg.at['min', 'Total_Orders']),
+                'max': int(agg.at['max', 'Total_Orders']),
+                'mean': float(agg.at['mean', 'Total_Orders'])
             }
         }
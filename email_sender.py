@@ -4,20 +4,225 @@ Email Sender Module
 Handles automated email distribution of reports with professional formatting.
 """
 
-import smtplib
-import ssl
+import binascii
+import mmap
+import os
+import queue
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from functools import lru_cache
 import logging
 from pathlib import Path
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.base import MIMEBase
-from email import encoders
+import mimetypes
+from email.message import EmailMessage, MIMEPart
+from email.policy import SMTP as SMTP_POLICY
 from email.utils import formataddr
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
+from urllib.parse import quote
 from datetime import datetime
+from html import escape
+from string import Template
 
 from config import get_config
 
+# smtplib, ssl, asyncio, gzip and concurrent.futures are imported where they are used, so
+# runs with email disabled never pay for them
+if TYPE_CHECKING:
+    import smtplib
+    import ssl
+    from concurrent.futures import Future
+
+SMTP_TIMEOUT = 30  # Seconds
+REPORT_CACHE_SIZE = 4  # Serialized report messages kept for resends
+
+# Attachment encode size; a multiple of 57 bytes so each chunk encodes to whole 76-char base64 lines
+ATTACHMENT_CHUNK_BYTES = 57 * 1024
+BASE64_LINE_LENGTH = 76
+
+# Subject line performance indicator by week-on-week sales change (%): below 0, from 0, from 5, from 10
+SUBJECT_THRESHOLDS = (0, 5, 10)
+SUBJECT_INDICATORS = ("📉 Declining", "➡️ Stable", "📊 Good Growth", "📈 Strong Growth")
+
+def _base64_lines(data) -> str:
+    """Base64-encode a bytes-like object into 76-column lines, written into one preallocated buffer."""
+    size = len(data)
+    line_bytes = BASE64_LINE_LENGTH // 4 * 3  # 57 raw bytes per encoded line
+    out = bytearray(-(-size // line_bytes) * (BASE64_LINE_LENGTH + 1))
+    pos = 0
+    for start in range(0, size, ATTACHMENT_CHUNK_BYTES):
+        encoded = binascii.b2a_base64(data[start:start + ATTACHMENT_CHUNK_BYTES], newline=False)
+        for i in range(0, len(encoded), BASE64_LINE_LENGTH):
+            line = encoded[i:i + BASE64_LINE_LENGTH]
+            end = pos + len(line)
+            out[pos:end] = line
+            out[end] = 0x0A  # newline
+            pos = end + 1
+    return out[:pos].decode('ascii')
+
+@lru_cache(maxsize=32)
+def _subject_prefix(subject_template: str, date_range: str) -> str:
+    """Format the subject template for a date range (memoized for repeated sends of the same week)."""
+    return subject_template.format(date_range=date_range)
+
+def _to_header(addresses: List[str]) -> bytes:
+    """Serialize a To header through the SMTP policy, so it is folded and non-ASCII is encoded."""
+    return SMTP_POLICY.fold_binary('To', ', '.join(addresses))
+
+def _chart_stem(chart_file: Path) -> str:
+    """Chart name without the cache key (sales_trend.<key>.png -> sales_trend)."""
+    return chart_file.name.split('.', 1)[0]
+
+# Report email HTML, compiled once. Colors and other config constants are
+# substituted when an EmailSender is created; per-report values at send time.
+REPORT_HTML_TEMPLATE = Template("""
+<html>
+<head>
+    <style>
+        body { 
+            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
+            line-height: 1.6; 
+            color: $text_dark;
+            margin: 0;
+            padding: 20px;
+        }
+        .header {
+            background: linear-gradient(135deg, $primary, $accent1);
+            color: white;
+            padding: 30px;
+            border-radius: 10px;
+            text-align: center;
+            margin-bottom: 30px;
+        }
+        .metrics-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
+            gap: 20px;
+            margin: 30px 0;
+        }
+        .metric-card {
+            background: white;
+            padding: 20px;
+            border-radius: 8px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+            border-left: 4px solid $primary;
+            text-align: center;
+        }
+        .metric-value {
+            font-size: 28px;
+            font-weight: bold;
+            margin: 10px 0;
+        }
+        .metric-change {
+            font-size: 16px;
+            font-weight: bold;
+        }
+        .positive { color: $positive; }
+        .negative { color: $negative; }
+        .insights {
+            background: #f8f9fa;
+            padding: 25px;
+            border-radius: 8px;
+            margin: 30px 0;
+        }
+        .insight-item {
+            background: white;
+            padding: 15px;
+            margin: 10px 0;
+            border-radius: 5px;
+            border-left: 3px solid $accent1;
+        }
+        .footer {
+            text-align: center;
+            margin-top: 40px;
+            padding: 20px;
+            background: #f8f9fa;
+            border-radius: 8px;
+            font-size: 14px;
+            color: $text_light;
+        }
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>📊 Weekly Business Report</h1>
+        <h2>$week_range</h2>
+        <p>Your comprehensive business performance summary</p>
+    </div>
+    
+    <div class="metrics-grid">
+        <div class="metric-card">
+            <div style="color: $primary; font-size: 18px; font-weight: bold;">💰 Sales Revenue</div>
+            <div class="metric-value">$currency$sales</div>
+            <div class="metric-change" style="color: $sales_color">
+                $sales_change%
+            </div>
+        </div>
+        
+        <div class="metric-card">
+            <div style="color: $primary; font-size: 18px; font-weight: bold;">🛒 Total Orders</div>
+            <div class="metric-value">$orders</div>
+            <div class="metric-change" style="color: $orders_color">
+                $orders_change%
+            </div>
+        </div>
+        
+        <div class="metric-card">
+            <div style="color: $primary; font-size: 18px; font-weight: bold;">📈 Avg Order Value</div>
+            <div class="metric-value">$currency$aov</div>
+            <div class="metric-change" style="color: $aov_color">
+                $aov_change%
+            </div>
+        </div>
+    </div>
+    
+    <div class="insights">
+        <h3 style="color: $primary;">🎯 Key Insights</h3>
+        <div class="insight-item">
+            <strong>⭐ Top Product:</strong> $top_product
+        </div>
+        <div class="insight-item">
+            <strong>🏆 Top Customer:</strong> $top_customer
+        </div>
+$insight_items
+    </div>
+    $downloads
+    <div class="footer">
+        <p><strong>$project_name</strong></p>
+        <p>Generated on $generated_at</p>
+        <p>This report contains confidential business information.</p>
+    </div>
+</body>
+</html>
+""")
+
+INSIGHT_ITEM_TEMPLATE = Template("""
+        <div class="insight-item">
+            <strong>$icon $metric:</strong> $message
+        </div>
+    """)
+
+RECOMMENDATIONS_HEADER_TEMPLATE = Template("""
+        <h4 style="color: $primary; margin-top: 25px;">💡 Top Recommendations</h4>
+    """)
+
+DOWNLOADS_TEMPLATE = Template("""
+    <div class="insights">
+        <h3 style="color: $primary;">📎 Downloads</h3>
+$links
+    </div>
+    """)
+
+DOWNLOAD_LINK_TEMPLATE = Template("""        <div class="insight-item"><a href="$url">$label</a></div>
+""")
+
+RECOMMENDATION_ITEM_TEMPLATE = Template("""
+            <div class="insight-item">
+                <strong>$icon $title:</strong> $description
+                <br><em>Timeline: $timeline | Impact: $expected_impact</em>
+            </div>
+        """)
+
 class EmailSender:
     """Handles automated email distribution of business reports."""
     
@@ -25,8 +230,122 @@ class EmailSender:
         """Initialize the email sender."""
         self.config = config or get_config()
         self.logger = logging.getLogger(__name__)
-        self.smtp_server = None
+        self._conn_pool = queue.LifoQueue()  # Idle (session, messages sent) pairs, reused across sends
+        self._executor = None  # Created on the first async send
+        self._executor_lock = threading.Lock()
+        self._ssl_ctx = None  # Created on first connection; CA bundle parsed once
+        self._report_cache = OrderedDict()  # Serialized report messages, most recent last
+        self._cache_lock = threading.Lock()
+        self._body_cache = None  # (metrics, insights, html body, text body) of the last report
+        
+        # Bake config constants into the report HTML templates once. The result is a template
+        # again, so '$' in a baked value (e.g. the currency symbol) is escaped as '$$'
+        colors = self.config.COLORS
+        baked = {key: value.replace('$', '$$') for key, value in {
+            'primary': colors['primary'], 'accent1': colors['accent1'],
+            'positive': colors['positive'], 'negative': colors['negative'],
+            'text_dark': colors['text_dark'], 'text_light': colors['text_light'],
+            'currency': escape(self.config.METRICS_CONFIG['currency_symbol']),
+            'project_name': escape(self.config.PROJECT_NAME)
+        }.items()}
+        self._report_html = Template(REPORT_HTML_TEMPLATE.safe_substitute(baked))
+        self._recommendations_header = RECOMMENDATIONS_HEADER_TEMPLATE.substitute(primary=colors['primary'])
+        self._downloads = Template(DOWNLOADS_TEMPLATE.safe_substitute(primary=baked['primary']))
+        
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """Wait for pending async sends, then close all pooled SMTP sessions."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
         
+        while True:
+            try:
+                server, _ = self._conn_pool.get_nowait()
+            except queue.Empty:
+                break
+            self._quit(server)
+    
+    @staticmethod
+    def _quit(server: 'smtplib.SMTP'):
+        """Close an SMTP session, ignoring errors from an already dropped connection."""
+        import smtplib
+        
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+    
+    def _acquire_smtp(self):
+        """Take a healthy idle session from the pool, or open a new one."""
+        import smtplib
+        
+        while True:
+            try:
+                server, sent = self._conn_pool.get_nowait()
+            except queue.Empty:
+                return self._connect(), 0
+            try:
+                server.noop()  # Health check before reuse
+                return server, sent
+            except (smtplib.SMTPException, OSError):
+                self._quit(server)
+    
+    def _release_smtp(self, server: 'smtplib.SMTP', sent: int):
+        """Return a session to the pool, or close it once it reaches the per-connection cap."""
+        # Providers cap messages per connection; start a fresh one at the limit
+        if sent >= self.config.EMAIL_CONFIG['max_emails_per_connection']:
+            self._quit(server)
+        else:
+            self._conn_pool.put((server, sent))
+    
+    def _get_ssl_context(self) -> 'ssl.SSLContext':
+        """Return the shared TLS context, creating it on first use."""
+        if self._ssl_ctx is None:
+            import ssl
+            self._ssl_ctx = ssl.create_default_context()
+        return self._ssl_ctx
+    
+    def _connect(self) -> 'smtplib.SMTP':
+        """Open a new SMTP session and log in."""
+        import smtplib
+        
+        host = self.config.EMAIL_CONFIG['smtp_server']
+        port = self.config.EMAIL_CONFIG['smtp_port']
+        if port == 465:
+            # Implicit TLS: no plaintext greeting + STARTTLS upgrade round trip
+            server = smtplib.SMTP_SSL(host, port, context=self._get_ssl_context(), timeout=SMTP_TIMEOUT)
+        else:
+            server = smtplib.SMTP(host, port, timeout=SMTP_TIMEOUT)
+            server.starttls(context=self._get_ssl_context())  # Enable TLS encryption
+        server.login(
+            self.config.EMAIL_CONFIG['sender_email'],
+            self.config.EMAIL_CONFIG['sender_password']
+        )
+        return server
+    
+    def send_report_email_async(self,
+                                report_file: Path,
+                                metrics: Dict[str, Any],
+                                insights: Dict[str, Any],
+                                chart_files: Optional[List[Path]] = None) -> 'Future':
+        """Send a report email on the worker pool; the Future resolves to the send result."""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.config.EMAIL_CONFIG['max_connections'],
+                    thread_name_prefix='email-sender'
+                )
+            return self._executor.submit(self.send_report_email, report_file, metrics, insights, chart_files)
+    
     def send_report_email(self, 
                          report_file: Path,
                          metrics: Dict[str, Any],
@@ -38,34 +357,14 @@ class EmailSender:
                 self.logger.info("Email sending is disabled in configuration")
                 return False
             
-            # Prepare email components
-            subject = self._generate_subject(metrics)
-            html_body = self._generate_html_body(metrics, insights)
-            text_body = self._generate_text_body(metrics, insights)
-            
-            # Create message
-            message = MIMEMultipart('alternative')
-            message['From'] = formataddr(('Business Analytics', self.config.EMAIL_CONFIG['sender_email']))
-            message['To'] = ', '.join(self.config.EMAIL_CONFIG['recipients'])
-            message['Subject'] = subject
-            
-            # Attach text and HTML versions
-            text_part = MIMEText(text_body, 'plain')
-            html_part = MIMEText(html_body, 'html')
-            message.attach(text_part)
-            message.attach(html_part)
-            
-            # Attach PDF report
-            self._attach_file(message, report_file, 'Weekly_Business_Report.pdf')
-            
-            # Attach charts if provided
-            if chart_files:
-                for chart_file in chart_files[:3]:  # Limit to 3 charts to avoid large emails
-                    if chart_file.exists():
-                        self._attach_file(message, chart_file, f"Chart_{chart_file.name}")
+            # Check before any message assembly; an empty list would only fail at SMTP
+            if not self.config.EMAIL_CONFIG['recipients']:
+                self.logger.warning("No email recipients configured; nothing to send")
+                return False
             
             # Send email
-            success = self._send_email(message)
+            payload = self._report_payload(report_file, metrics, insights, chart_files)
+            success = not self._send_serialized(payload)
             
             if success:
                 self.logger.info(f"Report email sent successfully to {len(self.config.EMAIL_CONFIG['recipients'])} recipients")
@@ -78,15 +377,160 @@ class EmailSender:
             self.logger.error(f"Error sending report email: {e}")
             return False
     
-    def send_alert_email(self, alert_type: str, message: str, metrics: Dict[str, Any]) -> bool:
-        """Send alert email for critical business conditions."""
+    async def send_report_emails_aio(self,
+                                     report_file: Path,
+                                     metrics: Dict[str, Any],
+                                     insights: Dict[str, Any],
+                                     chart_files: Optional[List[Path]] = None,
+                                     recipient_groups: Optional[List[List[str]]] = None) -> List[bool]:
+        """Send the report to several recipient groups concurrently over asyncio SMTP sessions."""
+        email_config = self.config.EMAIL_CONFIG
+        if recipient_groups is None:
+            recipients = email_config['recipients']
+            batch_size = email_config['max_recipients_per_message']
+            recipient_groups = [recipients[start:start + batch_size] for start in range(0, len(recipients), batch_size)]
+        
         try:
-            if not self.config.EMAIL_CONFIG['send_reports']:
-                return False
+            if not email_config['send_reports']:
+                self.logger.info("Email sending is disabled in configuration")
+                return [False] * len(recipient_groups)
             
-            subject = f"🚨 Business Alert: {alert_type}"
+            recipient_groups = [group for group in recipient_groups if group]
+            if not recipient_groups:
+                self.logger.warning("No email recipients configured; nothing to send")
+                return []
             
-            html_body = f"""
+            import asyncio
+            import aiosmtplib  # Optional dependency, only needed for this path
+            
+            payload = self._report_payload(report_file, metrics, insights, chart_files)
+        except ImportError:
+            self.logger.error("aiosmtplib is not installed; use send_report_email instead")
+            return [False] * len(recipient_groups)
+        except Exception as e:
+            self.logger.error(f"Error preparing report email: {e}")
+            return [False] * len(recipient_groups)
+        
+        host = email_config['smtp_server']
+        port = email_config['smtp_port']
+        sender = email_config['sender_email']
+        limit = asyncio.Semaphore(email_config['max_connections'])  # Provider concurrency cap
+        
+        async def send_one(group: List[str]) -> bool:
+            # Each group gets its own session; handshakes and DATA uploads overlap on one thread
+            text = _to_header(group) + payload
+            try:
+                async with limit:
+                    async with aiosmtplib.SMTP(hostname=host, port=port, use_tls=port == 465, start_tls=port != 465,
+                                               tls_context=self._get_ssl_context(), timeout=SMTP_TIMEOUT) as smtp:
+                        await smtp.login(sender, email_config['sender_password'])
+                        await smtp.sendmail(sender, group, text)
+                return True
+            except Exception as e:
+                self.logger.error(f"SMTP error sending to {len(group)} recipients: {e}")
+                return False
+        
+        results = await asyncio.gather(*(send_one(group) for group in recipient_groups))
+        self.logger.info(f"Report email sent to {sum(results)} of {len(results)} recipient groups")
+        return list(results)
+    
+    def _report_payload(self,
+                        report_file: Path,
+                        metrics: Dict[str, Any],
+                        insights: Dict[str, Any],
+                        chart_files: Optional[List[Path]] = None) -> bytes:
+        """Build and serialize the report message (without a To header), reusing a cached copy when possible."""
+        # Reuse the serialized message when the same report is sent again
+        try:
+            report_mtime = report_file.stat().st_mtime_ns
+        except OSError:
+            report_mtime = None  # Missing report; _attach_file logs it
+        cache_key = (str(report_file), report_mtime, id(metrics), id(insights),
+                     tuple(str(chart_file) for chart_file in (chart_files or [])[:3]))
+        with self._cache_lock:
+            cached = self._report_cache.get(cache_key)
+            if cached is not None:
+                self._report_cache.move_to_end(cache_key)
+        if cached is not None and cached[0] is metrics and cached[1] is insights:
+            return cached[2]
+        
+        # Prepare email components
+        subject = self._generate_subject(metrics)
+        include_text = self.config.EMAIL_CONFIG['include_text_alternative']
+        attachment_mode = self.config.EMAIL_CONFIG['attachment_mode']
+        links = self._attachment_links(report_file, chart_files) if attachment_mode == 'link' else None
+        html_body, text_body = self._get_bodies(metrics, insights, include_text, links)
+        
+        # Create message (the To header is added at send time)
+        message = EmailMessage(policy=SMTP_POLICY)
+        message['From'] = formataddr(('Business Analytics', self.config.EMAIL_CONFIG['sender_email']))
+        message['Subject'] = subject
+        
+        # Text (optional) and HTML versions
+        if include_text:
+            message.set_content(text_body)
+            message.add_alternative(html_body, subtype='html')
+        else:
+            message.set_content(html_body, subtype='html')
+        
+        # In link mode the body points at the published files; nothing is attached
+        if attachment_mode != 'link':
+            # Attach PDF report (gzip mode ships it compressed)
+            if attachment_mode == 'gzip':
+                self._attach_file(message, report_file, 'Weekly_Business_Report.pdf.gz', compress=True)
+            else:
+                self._attach_file(message, report_file, 'Weekly_Business_Report.pdf')
+            
+            # Attach charts if provided (PNGs are already compressed, so always as is)
+            if chart_files:
+                for chart_file in chart_files[:3]:  # Limit to 3 charts to avoid large emails
+                    # Missing files are skipped; recipients see the stable name, not the cache key
+                    self._attach_file(message, chart_file, f"Chart_{_chart_stem(chart_file)}{chart_file.suffix}")
+        
+        # Serialize once and keep it for resends; metrics/insights are held so their ids stay valid
+        payload = message.as_bytes()  # CRLF line endings, ready for DATA as is
+        with self._cache_lock:
+            self._report_cache[cache_key] = (metrics, insights, payload)
+            if len(self._report_cache) > REPORT_CACHE_SIZE:
+                self._report_cache.popitem(last=False)
+        
+        return payload
+    
+    def send_alert_email(self, alert_type: str, message: str, metrics: Dict[str, Any]) -> bool:
+        """Send alert email for critical business conditions."""
+        return bool(self.send_alert_emails([(alert_type, message)], metrics))
+    
+    def send_alert_emails(self, alerts: List[Tuple[str, str]], metrics: Dict[str, Any]) -> List[str]:
+        """Send several (alert_type, message) alerts back to back over one pooled SMTP session.
+        
+        Returns the alert types that were sent.
+        """
+        if not self.config.EMAIL_CONFIG['send_reports'] or not alerts:
+            return []
+        
+        if not self.config.EMAIL_CONFIG['recipients']:
+            self.logger.warning("No email recipients configured; nothing to send")
+            return []
+        
+        sent = []
+        for alert_type, message in alerts:
+            try:
+                # Each send borrows and returns the same idle session from the LIFO pool
+                if self._send_email(self._build_alert_message(alert_type, message, metrics)):
+                    sent.append(alert_type)
+            except Exception as e:
+                self.logger.error(f"Error sending alert email: {e}")
+        return sent
+    
+    def _build_alert_message(self, alert_type: str, message: str, metrics: Dict[str, Any]) -> EmailMessage:
+        """Build the alert email for one critical business condition."""
+        subject = f"🚨 Business Alert: {alert_type}"
+        currency = self.config.METRICS_CONFIG['currency_symbol']
+        current_week = metrics['current_week']
+        changes = metrics['changes']
+        aov = metrics['aov']
+        
+        html_body = f"""
             <html>
             <head>
                 <style>
@@ -105,9 +549,9 @@ class EmailSender:
                 <div class="metrics">
                     <h4>Current Week Metrics</h4>
                     <ul>
-                        <li>Sales: {self.config.METRICS_CONFIG['currency_symbol']}{metrics['current_week']['sales']:,.0f} ({metrics['changes']['sales_change']:+.1f}%)</li>
-                        <li>Orders: {metrics['current_week']['orders']:,} ({metrics['changes']['orders_change']:+.1f}%)</li>
-                        <li>AOV: {self.config.METRICS_CONFIG['currency_symbol']}{metrics['aov']['current']:.0f} ({metrics['aov']['change']:+.1f}%)</li>
+                        <li>Sales: {currency}{current_week['sales']:,.0f} ({changes['sales_change']:+.1f}%)</li>
+                        <li>Orders: {current_week['orders']:,} ({changes['orders_change']:+.1f}%)</li>
+                        <li>AOV: {currency}{aov['current']:.0f} ({aov['change']:+.1f}%)</li>
                     </ul>
                 </div>
                 
@@ -115,214 +559,125 @@ class EmailSender:
             </body>
             </html>
             """
-            
-            text_body = f"""
+        
+        text_body = f"""
             BUSINESS ALERT: {alert_type}
             
             {message}
             
             Current Week Metrics:
-            - Sales: {self.config.METRICS_CONFIG['currency_symbol']}{metrics['current_week']['sales']:,.0f} ({metrics['changes']['sales_change']:+.1f}%)
-            - Orders: {metrics['current_week']['orders']:,} ({metrics['changes']['orders_change']:+.1f}%)
-            - AOV: {self.config.METRICS_CONFIG['currency_symbol']}{metrics['aov']['current']:.0f} ({metrics['aov']['change']:+.1f}%)
+            - Sales: {currency}{current_week['sales']:,.0f} ({changes['sales_change']:+.1f}%)
+            - Orders: {current_week['orders']:,} ({changes['orders_change']:+.1f}%)
+            - AOV: {currency}{aov['current']:.0f} ({aov['change']:+.1f}%)
             
             This is an automated alert from your Business Intelligence System.
             """
-            
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['From'] = formataddr(('Business Analytics Alert', self.config.EMAIL_CONFIG['sender_email']))
-            msg['To'] = ', '.join(self.config.EMAIL_CONFIG['recipients'])
-            msg['Subject'] = subject
-            msg['X-Priority'] = '1'  # High priority
-            
-            msg.attach(MIMEText(text_body, 'plain'))
-            msg.attach(MIMEText(html_body, 'html'))
-            
-            return self._send_email(msg)
-            
-        except Exception as e:
-            self.logger.error(f"Error sending alert email: {e}")
-            return False
+        
+        # Create message
+        msg = EmailMessage(policy=SMTP_POLICY)
+        msg['From'] = formataddr(('Business Analytics Alert', self.config.EMAIL_CONFIG['sender_email']))
+        msg['Subject'] = subject
+        msg['X-Priority'] = '1'  # High priority
+        
+        msg.set_content(text_body)
+        msg.add_alternative(html_body, subtype='html')
+        
+        return msg
     
     def _generate_subject(self, metrics: Dict[str, Any]) -> str:
         """Generate email subject line."""
-        week_range = f"{metrics['current_week']['week_start_formatted']} - {metrics['current_week']['week_end_formatted']}"
+        current_week = metrics['current_week']
+        week_range = f"{current_week['week_start_formatted']} - {current_week['week_end_formatted']}"
         
         # Add performance indicator to subject
-        sales_change = metrics['changes']['sales_change']
-        if sales_change >= 10:
-            indicator = "📈 Strong Growth"
-        elif sales_change >= 5:
-            indicator = "📊 Good Growth"
-        elif sales_change >= 0:
-            indicator = "➡️ Stable"
-        else:
-            indicator = "📉 Declining"
+        indicator = SUBJECT_INDICATORS[bisect_right(SUBJECT_THRESHOLDS, metrics['changes']['sales_change'])]
         
-        return self.config.EMAIL_CONFIG['subject_template'].format(
-            date_range=week_range
-        ) + f" - {indicator}"
+        return _subject_prefix(self.config.EMAIL_CONFIG['subject_template'], week_range) + f" - {indicator}"
     
-    def _generate_html_body(self, metrics: Dict[str, Any], insights: Dict[str, Any]) -> str:
-        """Generate HTML email body."""
-        week_range = f"{metrics['current_week']['week_start_formatted']} - {metrics['current_week']['week_end_formatted']}"
+    def _attachment_links(self, report_file: Path, chart_files: Optional[List[Path]]) -> List[Tuple[str, str]]:
+        """Build (label, URL) download links for the report and charts under the configured base URL."""
+        base_url = self.config.EMAIL_CONFIG['attachment_base_url'].rstrip('/')
+        files = [('Weekly Business Report (PDF)', report_file)]
+        files.extend((f"Chart: {_chart_stem(chart_file)}", chart_file) for chart_file in (chart_files or [])[:3])
         
-        # Performance indicators with colors
-        sales_color = self.config.COLORS['positive'] if metrics['changes']['sales_change'] >= 0 else self.config.COLORS['negative']
-        orders_color = self.config.COLORS['positive'] if metrics['changes']['orders_change'] >= 0 else self.config.COLORS['negative']
-        aov_color = self.config.COLORS['positive'] if metrics['aov']['change'] >= 0 else self.config.COLORS['negative']
-        
-        html_body = f"""
-        <html>
-        <head>
-            <style>
-                body {{ 
-                    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
-                    line-height: 1.6; 
-                    color: {self.config.COLORS['text_dark']};
-                    margin: 0;
-                    padding: 20px;
-                }}
-                .header {{
-                    background: linear-gradient(135deg, {self.config.COLORS['primary']}, {self.config.COLORS['accent1']});
-                    color: white;
-                    padding: 30px;
-                    border-radius: 10px;
-                    text-align: center;
-                    margin-bottom: 30px;
-                }}
-                .metrics-grid {{
-                    display: grid;
-                    grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-                    gap: 20px;
-                    margin: 30px 0;
-                }}
-                .metric-card {{
-                    background: white;
-                    padding: 20px;
-                    border-radius: 8px;
-                    box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-                    border-left: 4px solid {self.config.COLORS['primary']};
-                    text-align: center;
-                }}
-                .metric-value {{
-                    font-size: 28px;
-                    font-weight: bold;
-                    margin: 10px 0;
-                }}
-                .metric-change {{
-                    font-size: 16px;
-                    font-weight: bold;
-                }}
-                .positive {{ color: {self.config.COLORS['positive']}; }}
-                .negative {{ color: {self.config.COLORS['negative']}; }}
-                .insights {{
-                    background: #f8f9fa;
-                    padding: 25px;
-                    border-radius: 8px;
-                    margin: 30px 0;
-                }}
-                .insight-item {{
-                    background: white;
-                    padding: 15px;
-                    margin: 10px 0;
-                    border-radius: 5px;
-                    border-left: 3px solid {self.config.COLORS['accent1']};
-                }}
-                .footer {{
-                    text-align: center;
-                    margin-top: 40px;
-                    padding: 20px;
-                    background: #f8f9fa;
-                    border-radius: 8px;
-                    font-size: 14px;
-                    color: {self.config.COLORS['text_light']};
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>📊 Weekly Business Report</h1>
-                <h2>{week_range}</h2>
-                <p>Your comprehensive business performance summary</p>
-            </div>
-            
-            <div class="metrics-grid">
-                <div class="metric-card">
-                    <div style="color: {self.config.COLORS['primary']}; font-size: 18px; font-weight: bold;">💰 Sales Revenue</div>
-                    <div class="metric-value">{self.config.METRICS_CONFIG['currency_symbol']}{metrics['current_week']['sales']:,.0f}</div>
-                    <div class="metric-change" style="color: {sales_color}">
-                        {metrics['changes']['sales_change']:+.1f}%
-                    </div>
-                </div>
-                
-                <div class="metric-card">
-                    <div style="color: {self.config.COLORS['primary']}; font-size: 18px; font-weight: bold;">🛒 Total Orders</div>
-                    <div class="metric-value">{metrics['current_week']['orders']:,}</div>
-                    <div class="metric-change" style="color: {orders_color}">
-                        {metrics['changes']['orders_change']:+.1f}%
-                    </div>
-                </div>
-                
-                <div class="metric-card">
-                    <div style="color: {self.config.COLORS['primary']}; font-size: 18px; font-weight: bold;">📈 Avg Order Value</div>
-                    <div class="metric-value">{self.config.METRICS_CONFIG['currency_symbol']}{metrics['aov']['current']:.0f}</div>
-                    <div class="metric-change" style="color: {aov_color}">
-                        {metrics['aov']['change']:+.1f}%
-                    </div>
-                </div>
-            </div>
-            
-            <div class="insights">
-                <h3 style="color: {self.config.COLORS['primary']};">🎯 Key Insights</h3>
-                <div class="insight-item">
-                    <strong>⭐ Top Product:</strong> {metrics['current_week']['top_product']}
-                </div>
-                <div class="insight-item">
-                    <strong>🏆 Top Customer:</strong> {metrics['current_week']['top_customer']}
-                </div>
-        """
+        links = []
+        for label, file_path in files:
+            # Published files keep their layout relative to the project directory
+            try:
+                relative = file_path.resolve().relative_to(self.config.BASE_DIR.resolve()).as_posix()
+            except ValueError:
+                relative = file_path.name
+            links.append((label, f"{base_url}/{quote(relative)}"))
+        return links
+    
+    def _get_bodies(self, metrics: Dict[str, Any], insights: Dict[str, Any], include_text: bool,
+                    links: Optional[List[Tuple[str, str]]] = None):
+        """Return (html body, text body or None), reusing the bodies built for the same metrics snapshot."""
+        cached = self._body_cache
+        if cached is not None and cached[0] is metrics and cached[1] is insights and cached[4] == links:
+            html_body, text_body = cached[2], cached[3]
+        else:
+            html_body, text_body = self._generate_html_body(metrics, insights, links), None
         
-        # Add top performance insights
-        performance_insights = insights['performance_analysis'][:3]
-        for insight in performance_insights:
-            html_body += f"""
-                <div class="insight-item">
-                    <strong>{insight['icon']} {insight['metric']}:</strong> {insight['message']}
-                </div>
-            """
+        if include_text and text_body is None:
+            text_body = self._generate_text_body(metrics, insights, links)
+        self._body_cache = (metrics, insights, html_body, text_body, links)
+        return html_body, text_body
+    
+    def _generate_html_body(self, metrics: Dict[str, Any], insights: Dict[str, Any],
+                            links: Optional[List[Tuple[str, str]]] = None) -> str:
+        """Generate HTML email body."""
+        current_week = metrics['current_week']
+        changes = metrics['changes']
+        positive = self.config.COLORS['positive']
+        negative = self.config.COLORS['negative']
         
-        # Add top recommendations
+        # Top performance insights, then top recommendations
+        items = [INSIGHT_ITEM_TEMPLATE.substitute(icon=insight.icon,
+                                                  metric=escape(str(insight.metric)),
+                                                  message=escape(str(insight.message)))
+                 for insight in insights['performance_analysis'][:3]]
         if insights['recommendations']:
-            html_body += """
-                <h4 style="color: """ + self.config.COLORS['primary'] + """; margin-top: 25px;">💡 Top Recommendations</h4>
-            """
-            for rec in insights['recommendations'][:2]:
-                html_body += f"""
-                    <div class="insight-item">
-                        <strong>{rec['icon']} {rec['title']}:</strong> {rec['description']}
-                        <br><em>Timeline: {rec['timeline']} | Impact: {rec['expected_impact']}</em>
-                    </div>
-                """
-        
-        html_body += f"""
-            </div>
-            
-            <div class="footer">
-                <p><strong>{self.config.PROJECT_NAME}</strong></p>
-                <p>Generated on {datetime.now().strftime('%d %B %Y at %H:%M')}</p>
-                <p>This report contains confidential business information.</p>
-            </div>
-        </body>
-        </html>
-        """
+            items.append(self._recommendations_header)
+            items.extend(RECOMMENDATION_ITEM_TEMPLATE.substitute(icon=rec['icon'],
+                                                                 title=escape(str(rec['title'])),
+                                                                 description=escape(str(rec['description'])),
+                                                                 timeline=escape(str(rec['timeline'])),
+                                                                 expected_impact=escape(str(rec['expected_impact'])))
+                         for rec in insights['recommendations'][:2])
+        
+        downloads = ''
+        if links:
+            downloads = self._downloads.substitute(links=''.join(
+                DOWNLOAD_LINK_TEMPLATE.substitute(url=escape(url), label=escape(label)) for label, url in links
+            ))
         
-        return html_body
+        return self._report_html.substitute(
+            week_range=escape(f"{current_week['week_start_formatted']} - {current_week['week_end_formatted']}"),
+            sales=f"{current_week['sales']:,.0f}",
+            sales_change=f"{changes['sales_change']:+.1f}",
+            sales_color=positive if changes['sales_change'] >= 0 else negative,
+            orders=f"{current_week['orders']:,}",
+            orders_change=f"{changes['orders_change']:+.1f}",
+            orders_color=positive if changes['orders_change'] >= 0 else negative,
+            aov=f"{metrics['aov']['current']:.0f}",
+            aov_change=f"{metrics['aov']['change']:+.1f}",
+            aov_color=positive if metrics['aov']['change'] >= 0 else negative,
+            top_product=escape(current_week['top_product']),
+            top_customer=escape(current_week['top_customer']),
+            insight_items=''.join(items),
+            downloads=downloads,
+            generated_at=datetime.now().strftime('%d %B %Y at %H:%M')
+        )
     
-    def _generate_text_body(self, metrics: Dict[str, Any], insights: Dict[str, Any]) -> str:
+    def _generate_text_body(self, metrics: Dict[str, Any], insights: Dict[str, Any],
+                            links: Optional[List[Tuple[str, str]]] = None) -> str:
         """Generate plain text email body."""
-        week_range = f"{metrics['current_week']['week_start_formatted']} - {metrics['current_week']['week_end_formatted']}"
+        currency = self.config.METRICS_CONFIG['currency_symbol']
+        current_week = metrics['current_week']
+        changes = metrics['changes']
+        aov = metrics['aov']
+        week_range = f"{current_week['week_start_formatted']} - {current_week['week_end_formatted']}"
         
         text_body = f"""
 WEEKLY BUSINESS REPORT
@@ -330,14 +685,14 @@ WEEKLY BUSINESS REPORT
 
 KEY METRICS:
 ============
-Sales Revenue: {self.config.METRICS_CONFIG['currency_symbol']}{metrics['current_week']['sales']:,.0f} ({metrics['changes']['sales_change']:+.1f}%)
-Total Orders: {metrics['current_week']['orders']:,} ({metrics['changes']['orders_change']:+.1f}%)
-Avg Order Value: {self.config.METRICS_CONFIG['currency_symbol']}{metrics['aov']['current']:.0f} ({metrics['aov']['change']:+.1f}%)
+Sales Revenue: {currency}{current_week['sales']:,.0f} ({changes['sales_change']:+.1f}%)
+Total Orders: {current_week['orders']:,} ({changes['orders_change']:+.1f}%)
+Avg Order Value: {currency}{aov['current']:.0f} ({aov['change']:+.1f}%)
 
 HIGHLIGHTS:
 ===========
-Top Product: {metrics['current_week']['top_product']}
-Top Customer: {metrics['current_week']['top_customer']}
+Top Product: {current_week['top_product']}
+Top Customer: {current_week['top_customer']}
 
 PERFORMANCE INSIGHTS:
 ====================
@@ -345,7 +700,7 @@ PERFORMANCE INSIGHTS:
         
         # Add performance insights
         for insight in insights['performance_analysis'][:3]:
-            text_body += f"• {insight['metric']}: {insight['message']}\n"
+            text_body += f"• {insight.metric}: {insight.message}\n"
         
         # Add recommendations
         if insights['recommendations']:
@@ -354,6 +709,13 @@ PERFORMANCE INSIGHTS:
             for i, rec in enumerate(insights['recommendations'][:3], 1):
                 text_body += f"{i}. {rec['title']}: {rec['description']}\n   Timeline: {rec['timeline']} | Impact: {rec['expected_impact']}\n\n"
         
+        # Add download links
+        if links:
+            text_body += "\nDOWNLOADS:\n"
+            text_body += "==========\n"
+            for label, url in links:
+                text_body += f"{label}: {url}\n"
+        
         text_body += f"""
 Generated by {self.config.PROJECT_NAME}
 {datetime.now().strftime('%d %B %Y at %H:%M')}
@@ -363,51 +725,102 @@ This report contains confidential business information.
         
         return text_body
     
-    def _attach_file(self, message: MIMEMultipart, file_path: Path, filename: str):
-        """Attach a file to the email message."""
+    def _attach_file(self, message: EmailMessage, file_path: Path, filename: str, compress: bool = False):
+        """Attach a file to the email message, optionally gzip-compressed."""
         try:
+            # Memory-map the file so the page cache, not a Python bytes copy, holds the raw data
             with open(file_path, 'rb') as attachment:
-                part = MIMEBase('application', 'octet-stream')
-                part.set_payload(attachment.read())
-            
-            encoders.encode_base64(part)
-            part.add_header(
-                'Content-Disposition',
-                f'attachment; filename= {filename}'
-            )
+                if os.fstat(attachment.fileno()).st_size == 0:
+                    encoded = ''  # Empty files cannot be mapped
+                else:
+                    with mmap.mmap(attachment.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        if compress:
+                            import gzip
+                            encoded = _base64_lines(gzip.compress(mapped))
+                        else:
+                            with memoryview(mapped) as view:
+                                encoded = _base64_lines(view)
+            
+            # Payload is already encoded, so it is set directly rather than through add_attachment
+            content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            if compress:
+                content_type = 'application/gzip'
+            part = MIMEPart(policy=SMTP_POLICY)
+            part['Content-Type'] = content_type
+            part['Content-Transfer-Encoding'] = 'base64'
+            part['Content-Disposition'] = 'attachment'
+            part.set_param('filename', filename, header='Content-Disposition')
+            part.set_payload(encoded)
+            
+            # Body parts move into a multipart/mixed container on the first attachment
+            if message.get_content_type() != 'multipart/mixed':
+                message.make_mixed()
             message.attach(part)
             
+        except FileNotFoundError:
+            self.logger.warning(f"Attachment not found, skipping: {file_path}")
         except Exception as e:
             self.logger.warning(f"Could not attach file {file_path}: {e}")
     
-    def _send_email(self, message: MIMEMultipart) -> bool:
-        """Send the email message."""
+    def _send_email(self, message: EmailMessage) -> bool:
+        """Send the email message (built without a To header)."""
+        return not self._send_serialized(message.as_bytes())
+    
+    def _send_serialized(self, payload: bytes, recipients: Optional[List[str]] = None) -> List[str]:
+        """Add the To header to a serialized message and send it to the recipients.
+        
+        Not atomic: each batch is delivered on its own and a failed batch does not stop
+        the rest. Returns the recipients whose batch failed (empty when all were reached),
+        so a retry can target just those instead of duplicating earlier batches.
+        """
+        email_config = self.config.EMAIL_CONFIG
+        sender = email_config['sender_email']
+        if recipients is None:
+            recipients = email_config['recipients']
+        batch_size = email_config['max_recipients_per_message']
+        
         try:
-            # Create SMTP session
-            server = smtplib.SMTP(
-                self.config.EMAIL_CONFIG['smtp_server'], 
-                self.config.EMAIL_CONFIG['smtp_port']
-            )
-            server.starttls()  # Enable TLS encryption
-            server.login(
-                self.config.EMAIL_CONFIG['sender_email'],
-                self.config.EMAIL_CONFIG['sender_password']
-            )
-            
-            # Send email
-            text = message.as_string()
-            server.sendmail(
-                self.config.EMAIL_CONFIG['sender_email'],
-                self.config.EMAIL_CONFIG['recipients'],
-                text
-            )
-            server.quit()
-            
-            return True
-            
+            # Several batches: keep the list private, recipients go in the envelope only (BCC)
+            text = _to_header(recipients if len(recipients) <= batch_size else [sender]) + payload
         except Exception as e:
-            self.logger.error(f"SMTP error: {e}")
-            return False
+            self.logger.error(f"Error preparing message for sending: {e}")
+            return list(recipients)
+        
+        # Each batch is one DATA transaction with its own RCPT TO list
+        failed = []
+        for start in range(0, len(recipients), batch_size):
+            batch = recipients[start:start + batch_size]
+            try:
+                self._deliver(sender, batch, text)
+            except Exception as e:
+                self.logger.error(f"SMTP error sending to recipients {start + 1}-{start + len(batch)}: {e}")
+                failed.extend(batch)
+        
+        if failed and len(failed) < len(recipients):
+            self.logger.warning(f"Delivered to {len(recipients) - len(failed)} of {len(recipients)} recipients; "
+                                f"not delivered to: {', '.join(failed)}")
+        return failed
+    
+    def _deliver(self, sender: str, recipients: List[str], text: bytes):
+        """Send one message over a pooled session, reconnecting once if it was dropped."""
+        import smtplib
+        
+        server, sent = self._acquire_smtp()
+        try:
+            server.sendmail(sender, recipients, text)
+        except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError):
+            self._quit(server)
+            server, sent = self._connect(), 0
+            try:
+                server.sendmail(sender, recipients, text)
+            except Exception:
+                self._quit(server)
+                raise
+        except Exception:
+            self._quit(server)
+            raise
+        
+        self._release_smtp(server, sent + 1)
     
     def test_email_connection(self) -> bool:
         """Test email server connection and authentication."""
@@ -416,16 +829,8 @@ This report contains confidential business information.
                 self.logger.error("Email credentials not configured")
                 return False
             
-            server = smtplib.SMTP(
-                self.config.EMAIL_CONFIG['smtp_server'], 
-                self.config.EMAIL_CONFIG['smtp_port']
-            )
-            server.starttls()
-            server.login(
-                self.config.EMAIL_CONFIG['sender_email'],
-                self.config.EMAIL_CONFIG['sender_password']
-            )
-            server.quit()
+            # Opens (and pools) a session, or health-checks an idle one
+            self._release_smtp(*self._acquire_smtp())
             
             self.logger.info("Email connection test successful")
             return True
@@ -441,6 +846,10 @@ This report contains confidential business information.
                 self.logger.info("Email sending is disabled")
                 return False
             
+            if not self.config.EMAIL_CONFIG['recipients']:
+                self.logger.warning("No email recipients configured; nothing to send")
+                return False
+            
             subject = "Test Email - Business Report System"
             
             html_body = f"""
@@ -467,13 +876,12 @@ This report contains confidential business information.
             If you received this email, your report distribution system is properly configured.
             """
             
-            message = MIMEMultipart('alternative')
+            message = EmailMessage(policy=SMTP_POLICY)
             message['From'] = formataddr(('Business Analytics Test', self.config.EMAIL_CONFIG['sender_email']))
-            message['To'] = ', '.join(self.config.EMAIL_CONFIG['recipients'])
             message['Subject'] = subject
             
-            message.attach(MIMEText(text_body, 'plain'))
-            message.attach(MIMEText(html_body, 'html'))
+            message.set_content(text_body)
+            message.add_alternative(html_body, subtype='html')
             
             success = self._send_email(message)
             
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Insight Kernels Module
+Batched classification of percentage changes into qualifier and status codes.
+"""
+
+import numpy as np
+from typing import Tuple
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _classify(changes, qualifier_thresholds, status_thresholds):
+        n = changes.size
+        qualifiers = np.empty(n, dtype=np.int8)
+        statuses = np.empty(n, dtype=np.int8)
+        for i in range(n):
+            change = changes[i]
+            magnitude = abs(change)
+
+            # Code = number of (sorted) thresholds reached
+            q = 0
+            for t in qualifier_thresholds:
+                if magnitude >= t:
+                    q += 1
+            s = 0
+            for t in status_thresholds:
+                if change >= t:
+                    s += 1
+            qualifiers[i] = q
+            statuses[i] = s
+        return qualifiers, statuses
+else:
+    def _classify(changes, qualifier_thresholds, status_thresholds):
+        qualifiers = np.searchsorted(qualifier_thresholds, np.abs(changes), side='right').astype(np.int8)
+        statuses = np.searchsorted(status_thresholds, changes, side='right').astype(np.int8)
+        # searchsorted ranks NaN above every threshold; a NaN change reaches none of them
+        nan = np.isnan(changes)
+        qualifiers[nan] = 0
+        statuses[nan] = 0
+        return qualifiers, statuses
+
+def classify_changes(changes, qualifier_thresholds, status_thresholds) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (qualifier codes, status codes) for an array of % changes; codes index the label tables."""
+    return _classify(np.ascontiguousarray(changes, dtype=np.float64),
+                     np.asarray(qualifier_thresholds, dtype=np.float64),
+                     np.asarray(status_thresholds, dtype=np.float64))
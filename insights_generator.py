@@ -4,12 +4,189 @@ Insights Generator Module
 Generates intelligent business insights and recommendations based on data analysis.
 """
 
+import hashlib
+import io
 import logging
-from typing import Dict, List, Any, Tuple
+import math
+import os
+import pickle
+from operator import attrgetter, itemgetter
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import Mapping
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, Any, Optional, Tuple, NamedTuple
 from datetime import datetime, timedelta
 import numpy as np
 
 from config import get_config
+from insight_kernels import classify_changes
+
+INSIGHTS_CACHE_SIZE = 64  # Insight sets kept per generator, keyed by metrics content
+INSIGHTS_CACHE_VERSION = 2  # Bump when insight wording or rules change, to invalidate the disk cache
+
+# Label lookup tables: a value maps to the label after the last threshold it reaches
+QUALIFIER_THRESHOLDS = (5, 10, 20)  # Applied to the absolute % change
+QUALIFIER_LABELS = ("slightly", "moderately", "significantly", "dramatically")
+STATUS_THRESHOLDS = (-5, 0, 5, 10)
+STATUS_LABELS = ("critical", "concerning", "fair", "good", "excellent")
+
+# Volatility (coefficient of variation) levels: the number of thresholds strictly exceeded
+VOLATILITY_THRESHOLDS = (0.15, 0.2, 0.3)
+VOLATILITY_LABELS = ("low", "moderate", "moderate", "high")
+VOLATILITY_ELEVATED = 2  # Above 0.2: volatility alert and stability recommendation
+VOLATILITY_HIGH = 3  # Above 0.3: volatility risk
+
+# Shared priority/level values and icons, so every entry references the same objects
+LEVEL_HIGH = "High"
+LEVEL_MEDIUM = "Medium"
+LEVEL_LOW = "Low"
+ICON_UP = "📈"
+ICON_DOWN = "📉"
+ICON_WARNING = "⚠️"
+
+# Metrics every insights run reads, as (section, field) pairs
+REQUIRED_METRICS = (
+    ('current_week', 'week_end_formatted'),
+    ('current_week', 'sales'),
+    ('current_week', 'orders'),
+    ('changes', 'sales_change'),
+    ('changes', 'orders_change'),
+    ('aov', 'current'),
+    ('aov', 'change'),
+)
+
+# Message templates; changes are passed as absolute values where the wording carries the sign
+EXECUTIVE_SUMMARY_TEMPLATE = (
+    "Week ending {week_end} Performance Summary:\n"
+    "        \n"
+    "        Sales {sales_trend} {sales_qualifier} by {sales_change:.1f}% to {currency}{sales:,.0f}, \n"
+    "        while orders {orders_trend} {orders_qualifier} by {orders_change:.1f}% to {orders:,} units.\n"
+    "        \n"
+    "        The average order value is currently {currency}{aov:.0f}, \n"
+    "        representing a {aov_change:.1f}% {aov_trend} from the previous week."
+)
+SALES_UP_MESSAGE = "Sales performance is strong with {qualifier} growth of {change:.1f}% to {currency}{value:,.0f}."
+SALES_DOWN_MESSAGE = "Sales declined {qualifier} by {change:.1f}% to {currency}{value:,.0f}, requiring attention."
+ORDERS_UP_MESSAGE = "Order volume shows {qualifier} improvement of {change:.1f}% to {value:,} orders."
+ORDERS_DOWN_MESSAGE = "Order volume decreased {qualifier} by {change:.1f}% to {value:,} orders."
+AOV_UP_MESSAGE = "Average order value increased {qualifier} by {change:.1f}% to {currency}{value:.0f}."
+AOV_DOWN_MESSAGE = "Average order value declined {qualifier} by {change:.1f}% to {currency}{value:.0f}."
+
+def _specialize(template: str, currency: str) -> Callable[..., str]:
+    """Bake the currency symbol into a format template and return its bound format method."""
+    symbol = currency.replace("{", "{{").replace("}", "}}")
+    return template.replace("{currency}", symbol).format
+
+def _freeze(value):
+    """Convert nested metrics into a hashable structure (dict order ignored, numpy scalars unwrapped)."""
+    if isinstance(value, dict):
+        return tuple(sorted((str(key), _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, np.ndarray):
+        return tuple(value.tolist())
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+def _metrics_key(metrics: Dict[str, Any], currency: str) -> bytes:
+    """Content digest of a metrics dict (and the settings that shape the output), stable across processes."""
+    payload = repr((INSIGHTS_CACHE_VERSION, currency, _freeze(metrics)))
+    return hashlib.blake2b(payload.encode(), digest_size=16).digest()
+
+class PerformanceInsight(NamedTuple):
+    """One entry of insights['performance_analysis']."""
+    metric: str
+    status: str
+    message: str
+    icon: str
+
+class RiskAlert(NamedTuple):
+    """One entry of insights['risk_alerts']."""
+    level: str
+    category: str
+    description: str
+    mitigation: str
+    icon: str
+
+class Opportunity(NamedTuple):
+    """One entry of insights['opportunities']."""
+    potential: str
+    category: str
+    description: str
+    action: str
+    icon: str
+
+class _TopPerformers(NamedTuple):
+    """Current and historical top product or customer, read once per insights run."""
+    current: str
+    most_frequent: str
+    unique_count: int
+
+class _InsightContext(NamedTuple):
+    """Week-on-week changes and their derived labels, computed once per insights run."""
+    sales_change: float
+    orders_change: float
+    aov_change: float
+    sales_qualifier: str
+    orders_qualifier: str
+    aov_qualifier: str
+    sales_status: str
+    orders_status: str
+    aov_status: str
+    currency: str
+    sales_volatility_level: int
+    orders_volatility_level: int
+    trends: Optional[Dict[str, Any]]  # None when trends are missing or had insufficient data
+    products: Optional[_TopPerformers]  # None when product metrics are missing
+    customers: Optional[_TopPerformers]  # None when customer metrics are missing
+
+class PrioritizedList(list):
+    """List of insight entries that also groups them by level as they are appended.
+    
+    Entries keep their original order; by_level() returns one group without a scan.
+    Only append() files entries into groups.
+    """
+    
+    def __init__(self, level_of: Callable[[Any], str]):
+        super().__init__()
+        self._level_of = level_of  # itemgetter/attrgetter, so the list stays picklable
+        self._groups = {}
+    
+    def append(self, item: Any):
+        super().append(item)
+        self._groups.setdefault(self._level_of(item), []).append(item)
+    
+    def by_level(self, level: str) -> List[Any]:
+        """Entries with the given level ('High', 'Medium', 'Low'), in insertion order."""
+        return self._groups.get(level, [])
+
+class _LazyInsights(Mapping):
+    """Read-only insights mapping whose sections are computed on first access, then kept."""
+    
+    def __init__(self, computers: Dict[str, Callable[[], Any]]):
+        self._computers = computers
+        self._sections = {}
+    
+    def __getitem__(self, name: str) -> Any:
+        try:
+            return self._sections[name]
+        except KeyError:
+            pass
+        section = self._computers[name]()  # KeyError for unknown sections, as with a dict
+        self._sections[name] = section
+        return section
+    
+    def __iter__(self):
+        return iter(self._computers)
+    
+    def __len__(self) -> int:
+        return len(self._computers)
+    
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(computed={list(self._sections)})"
 
 class InsightsGenerator:
     """Generates intelligent business insights and actionable recommendations."""
@@ -18,115 +195,232 @@ class InsightsGenerator:
         """Initialize the insights generator."""
         self.config = config or get_config()
         self.logger = logging.getLogger(__name__)
-        
-    def generate_comprehensive_insights(self, metrics: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate comprehensive business insights from metrics."""
+        self._currency = self.config.METRICS_CONFIG['currency_symbol']
+        self._format_executive_summary = _specialize(EXECUTIVE_SUMMARY_TEMPLATE, self._currency)
+        self._insights_cache = OrderedDict()  # Metrics digest -> insights, most recent last
+        
+        # Optional on-disk cache, so reruns in a new process skip the analysis too
+        self._disk_cache_dir = None
+        if self.config.INSIGHTS_CONFIG['disk_cache']:
+            self._disk_cache_dir = self.config.CACHE_DIR / 'insights'
+        
+    def generate_comprehensive_insights(self, metrics: Dict[str, Any]) -> Mapping:
+        """Generate comprehensive business insights from metrics.
+        
+        Returns a read-only mapping whose sections are computed on first access, so
+        callers only pay for the sections they use; do not modify metrics afterwards.
+        Results are memoized on the metrics content, so repeat calls with the same
+        metrics return the same (shared) mapping.
+        """
         try:
-            insights = {
-                'executive_summary': self._generate_executive_summary(metrics),
-                'performance_analysis': self._analyze_performance(metrics),
-                'trend_insights': self._analyze_trends(metrics),
-                'product_insights': self._analyze_products(metrics),
-                'customer_insights': self._analyze_customers(metrics),
-                'recommendations': self._generate_recommendations(metrics),
-                'risk_alerts': self._identify_risks(metrics),
-                'opportunities': self._identify_opportunities(metrics)
-            }
+            key = _metrics_key(metrics, self._currency)
+            cached = self._insights_cache.get(key)
+            if cached is not None:
+                self._insights_cache.move_to_end(key)
+                return cached
+            
+            cached = self._load_from_disk(key)
+            if cached is not None:
+                self._remember(key, cached)
+                self.logger.info("Insights loaded from disk cache")
+                return cached
             
-            self.logger.info("Comprehensive insights generated successfully")
+            self._validate_metrics(metrics)
+            ctx = self._build_context(metrics)
+            insights = _LazyInsights({
+                'executive_summary': partial(self._generate_executive_summary, metrics, ctx),
+                'performance_analysis': partial(self._analyze_performance, metrics, ctx),
+                'trend_insights': partial(self._analyze_trends, metrics, ctx),
+                'product_insights': partial(self._analyze_products, metrics, ctx),
+                'customer_insights': partial(self._analyze_customers, metrics, ctx),
+                'recommendations': partial(self._generate_recommendations, metrics, ctx),
+                'risk_alerts': partial(self._identify_risks, metrics, ctx),
+                'opportunities': partial(self._identify_opportunities, metrics, ctx)
+            })
+            
+            self._remember(key, insights)
+            if self._disk_cache_dir is not None:
+                self._save_to_disk(key, dict(insights))  # Pickled fully computed
+            
+            self.logger.info("Comprehensive insights prepared successfully")
             return insights
             
         except Exception as e:
-            self.logger.error(f"Error generating insights: {e}")
+            self.logger.error("Error generating insights: %s", e)
             raise
     
-    def _generate_executive_summary(self, metrics: Dict[str, Any]) -> str:
+    def _remember(self, key: bytes, insights: Mapping):
+        """Store insights in the in-memory LRU cache."""
+        self._insights_cache[key] = insights
+        if len(self._insights_cache) > INSIGHTS_CACHE_SIZE:
+            self._insights_cache.popitem(last=False)
+    
+    def _disk_cache_path(self, key: bytes) -> Optional[Path]:
+        """Return the pickle path for a key, or None when the disk cache is disabled."""
+        if self._disk_cache_dir is None:
+            return None
+        return self._disk_cache_dir / f"{key.hex()}.pkl"
+    
+    def _load_from_disk(self, key: bytes) -> Optional[Dict[str, Any]]:
+        """Load cached insights from disk, treating unreadable entries as misses."""
+        path = self._disk_cache_path(key)
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb') as cache_file:
+                return pickle.load(cache_file)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning("Ignoring unreadable insights cache entry %s: %s", path.name, e)
+            return None
+    
+    def _save_to_disk(self, key: bytes, insights: Dict[str, Any]):
+        """Write insights to the disk cache, then evict the oldest entries past the size limit."""
+        path = self._disk_cache_path(key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_suffix('.tmp')
+            with open(temp_path, 'wb') as cache_file:
+                pickle.dump(insights, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+            temp_path.replace(path)  # Readers never see a partial file
+            self._evict_disk_cache()
+        except OSError as e:
+            self.logger.warning("Could not write insights cache: %s", e)
+    
+    def _evict_disk_cache(self):
+        """Delete the oldest cache files (FIFO by modification time) until under the size limit."""
+        max_bytes = self.config.INSIGHTS_CONFIG['disk_cache_max_bytes']
+        with os.scandir(self._disk_cache_dir) as entries:
+            files = [(entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                     for entry in entries if entry.name.endswith('.pkl')]
+        
+        total = sum(size for _, size, _ in files)
+        for _, size, file_path in sorted(files):
+            if total <= max_bytes:
+                break
+            try:
+                os.unlink(file_path)
+                total -= size
+            except FileNotFoundError:
+                pass
+    
+    def _validate_metrics(self, metrics: Dict[str, Any]):
+        """Check the required metrics in one pass, so lazily computed sections cannot fail on them later."""
+        missing = [f"{section}.{field}" for section, field in REQUIRED_METRICS
+                   if field not in metrics.get(section, {})]
+        if missing:
+            raise ValueError(f"Metrics are missing required values: {', '.join(missing)}")
+    
+    def _build_context(self, metrics: Dict[str, Any]) -> _InsightContext:
+        """Read the week-on-week changes once and derive their qualifiers and status levels."""
+        sales_change = metrics['changes']['sales_change']
+        orders_change = metrics['changes']['orders_change']
+        aov_change = metrics['aov']['change']
+        qualifier = self._get_performance_qualifier
+        status = self._get_status_level
+        
+        # Both volatilities classified against all thresholds in one comparison
+        trends = metrics.get('trends', {})
+        volatility = np.nan_to_num(np.array([trends.get('sales_volatility', 0.0), trends.get('orders_volatility', 0.0)],
+                                            dtype=float), nan=0.0)  # NaN compares as low, as before
+        sales_level, orders_level = np.searchsorted(VOLATILITY_THRESHOLDS, volatility, side='left').tolist()
+        have_trends = 'trends' in metrics and trends.get('status') != 'insufficient_data'
+        products = metrics.get('products')
+        customers = metrics.get('customers')
+        
+        return _InsightContext(
+            sales_change, orders_change, aov_change,
+            qualifier(sales_change), qualifier(orders_change), qualifier(aov_change),
+            status(sales_change), status(orders_change), status(aov_change),
+            self._currency,
+            sales_level, orders_level,
+            trends if have_trends else None,
+            _TopPerformers(products['current_top_product'], products['most_frequent_top_product'],
+                           products['unique_products_count']) if products is not None else None,
+            _TopPerformers(customers['current_top_customer'], customers['most_frequent_top_customer'],
+                           customers['unique_customers_count']) if customers is not None else None
+        )
+    
+    def _generate_executive_summary(self, metrics: Dict[str, Any], ctx: _InsightContext) -> str:
         """Generate executive summary of business performance."""
         current_week = metrics['current_week']
-        changes = metrics['changes']
-        
-        # Determine overall performance
-        sales_trend = "increased" if changes['sales_change'] >= 0 else "decreased"
-        orders_trend = "increased" if changes['orders_change'] >= 0 else "decreased"
         
-        # Performance qualifier
-        sales_qualifier = self._get_performance_qualifier(changes['sales_change'])
-        orders_qualifier = self._get_performance_qualifier(changes['orders_change'])
-        
-        summary = f"""
-        Week ending {current_week['week_end_formatted']} Performance Summary:
-        
-        Sales {sales_trend} {sales_qualifier} by {abs(changes['sales_change']):.1f}% to {self.config.METRICS_CONFIG['currency_symbol']}{current_week['sales']:,.0f}, 
-        while orders {orders_trend} {orders_qualifier} by {abs(changes['orders_change']):.1f}% to {current_week['orders']:,} units.
-        
-        The average order value is currently {self.config.METRICS_CONFIG['currency_symbol']}{metrics['aov']['current']:.0f}, 
-        representing a {abs(metrics['aov']['change']):.1f}% {"increase" if metrics['aov']['change'] >= 0 else "decrease"} from the previous week.
-        """
-        
-        return summary.strip()
+        return self._format_executive_summary(
+            week_end=current_week['week_end_formatted'],
+            sales_trend="increased" if ctx.sales_change >= 0 else "decreased",
+            sales_qualifier=ctx.sales_qualifier,
+            sales_change=abs(ctx.sales_change),
+            sales=current_week['sales'],
+            orders_trend="increased" if ctx.orders_change >= 0 else "decreased",
+            orders_qualifier=ctx.orders_qualifier,
+            orders_change=abs(ctx.orders_change),
+            orders=current_week['orders'],
+            aov=metrics['aov']['current'],
+            aov_change=abs(ctx.aov_change),
+            aov_trend="increase" if ctx.aov_change >= 0 else "decrease"
+        )
     
-    def _analyze_performance(self, metrics: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _analyze_performance(self, metrics: Dict[str, Any], ctx: _InsightContext) -> List[PerformanceInsight]:
         """Analyze current performance against benchmarks."""
         performance_insights = []
         
         # Sales performance analysis
-        sales_change = metrics['changes']['sales_change']
-        sales_insight = {
-            'metric': 'Sales Performance',
-            'status': self._get_status_level(sales_change),
-            'message': self._get_sales_performance_message(sales_change, metrics),
-            'icon': '📈' if sales_change >= 0 else '📉'
-        }
+        sales_insight = PerformanceInsight(
+            metric='Sales Performance',
+            status=ctx.sales_status,
+            message=self._get_sales_performance_message(ctx, metrics),
+            icon=ICON_UP if ctx.sales_change >= 0 else ICON_DOWN
+        )
         performance_insights.append(sales_insight)
         
         # Orders performance analysis
-        orders_change = metrics['changes']['orders_change']
-        orders_insight = {
-            'metric': 'Order Volume',
-            'status': self._get_status_level(orders_change),
-            'message': self._get_orders_performance_message(orders_change, metrics),
-            'icon': '🛒' if orders_change >= 0 else '📦'
-        }
+        orders_insight = PerformanceInsight(
+            metric='Order Volume',
+            status=ctx.orders_status,
+            message=self._get_orders_performance_message(ctx, metrics),
+            icon='🛒' if ctx.orders_change >= 0 else '📦'
+        )
         performance_insights.append(orders_insight)
         
         # AOV analysis
-        aov_change = metrics['aov']['change']
-        aov_insight = {
-            'metric': 'Average Order Value',
-            'status': self._get_status_level(aov_change),
-            'message': self._get_aov_performance_message(aov_change, metrics),
-            'icon': '💰' if aov_change >= 0 else '💸'
-        }
+        aov_insight = PerformanceInsight(
+            metric='Average Order Value',
+            status=ctx.aov_status,
+            message=self._get_aov_performance_message(ctx, metrics),
+            icon='💰' if ctx.aov_change >= 0 else '💸'
+        )
         performance_insights.append(aov_insight)
         
         # Growth rate analysis
         if 'historical' in metrics:
             growth_rate = metrics['historical']['sales_growth_rate']
-            growth_insight = {
-                'metric': 'Overall Growth Trend',
-                'status': self._get_status_level(growth_rate),
-                'message': f"Overall growth rate is {growth_rate:.1f}% over the analyzed period, indicating {'strong momentum' if growth_rate > 5 else 'steady progress' if growth_rate > 0 else 'declining performance'}.",
-                'icon': '📊'
-            }
+            growth_insight = PerformanceInsight(
+                metric='Overall Growth Trend',
+                status=self._get_status_level(growth_rate),
+                message=f"Overall growth rate is {growth_rate:.1f}% over the analyzed period, indicating {'strong momentum' if growth_rate > 5 else 'steady progress' if growth_rate > 0 else 'declining performance'}.",
+                icon='📊'
+            )
             performance_insights.append(growth_insight)
         
         return performance_insights
     
-    def _analyze_trends(self, metrics: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _analyze_trends(self, metrics: Dict[str, Any], ctx: _InsightContext) -> List[Dict[str, Any]]:
         """Analyze trends and patterns in the data."""
         trend_insights = []
         
-        if 'trends' in metrics and metrics['trends'].get('status') != 'insufficient_data':
-            trends = metrics['trends']
-            
+        trends = ctx.trends
+        if trends is not None:
             # Sales trend analysis
             sales_trend_direction = trends['sales_trend_direction']
             sales_trend_insight = {
                 'type': 'Sales Trend',
                 'direction': sales_trend_direction,
                 'message': self._get_trend_message('sales', sales_trend_direction, trends),
-                'volatility': self._assess_volatility(trends['sales_volatility']),
-                'icon': '📈' if sales_trend_direction == 'increasing' else '📉' if sales_trend_direction == 'decreasing' else '➡️'
+                'volatility': VOLATILITY_LABELS[ctx.sales_volatility_level],
+                'icon': ICON_UP if sales_trend_direction == 'increasing' else ICON_DOWN if sales_trend_direction == 'decreasing' else '➡️'
             }
             trend_insights.append(sales_trend_insight)
             
@@ -136,34 +430,31 @@ class InsightsGenerator:
                 'type': 'Orders Trend',
                 'direction': orders_trend_direction,
                 'message': self._get_trend_message('orders', orders_trend_direction, trends),
-                'volatility': self._assess_volatility(trends['orders_volatility']),
+                'volatility': VOLATILITY_LABELS[ctx.orders_volatility_level],
                 'icon': '🛒' if orders_trend_direction == 'increasing' else '📦' if orders_trend_direction == 'decreasing' else '➡️'
             }
             trend_insights.append(orders_trend_insight)
             
             # Volatility insights
-            if trends['sales_volatility'] > 0.2 or trends['orders_volatility'] > 0.2:
+            if max(ctx.sales_volatility_level, ctx.orders_volatility_level) >= VOLATILITY_ELEVATED:
                 volatility_insight = {
                     'type': 'Volatility Alert',
                     'direction': 'variable',
                     'message': 'Business metrics show high volatility, indicating inconsistent performance that may require operational review.',
                     'volatility': 'high',
-                    'icon': '⚠️'
+                    'icon': ICON_WARNING
                 }
                 trend_insights.append(volatility_insight)
         
         return trend_insights
     
-    def _analyze_products(self, metrics: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _analyze_products(self, metrics: Dict[str, Any], ctx: _InsightContext) -> List[Dict[str, Any]]:
         """Analyze product performance and patterns."""
         product_insights = []
         
-        if 'products' in metrics:
-            products = metrics['products']
-            
+        if ctx.products is not None:
             # Current top product
-            current_product = products['current_top_product']
-            most_frequent = products['most_frequent_top_product']
+            current_product, most_frequent, unique_products = ctx.products
             
             if current_product != most_frequent:
                 product_insights.append({
@@ -181,13 +472,12 @@ class InsightsGenerator:
                 })
             
             # Product diversity
-            unique_products = products['unique_products_count']
             if unique_products < 3:
                 product_insights.append({
                     'type': 'Product Concentration Risk',
                     'message': f"Only {unique_products} different products have been top performers, indicating high concentration.",
                     'action': 'Consider diversifying product portfolio or boosting underperforming products.',
-                    'icon': '⚠️'
+                    'icon': ICON_WARNING
                 })
             else:
                 product_insights.append({
@@ -199,16 +489,12 @@ class InsightsGenerator:
         
         return product_insights
     
-    def _analyze_customers(self, metrics: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _analyze_customers(self, metrics: Dict[str, Any], ctx: _InsightContext) -> List[Dict[str, Any]]:
         """Analyze customer performance and relationships."""
         customer_insights = []
         
-        if 'customers' in metrics:
-            customers = metrics['customers']
-            
-            current_customer = customers['current_top_customer']
-            most_frequent = customers['most_frequent_top_customer']
-            unique_customers = customers['unique_customers_count']
+        if ctx.customers is not None:
+            current_customer, most_frequent, unique_customers = ctx.customers
             
             # Customer loyalty analysis
             if current_customer == most_frequent:
@@ -232,7 +518,7 @@ class InsightsGenerator:
                     'type': 'Customer Concentration Risk',
                     'message': f"High customer concentration with only {unique_customers} different top customers.",
                     'action': 'Develop strategies to expand customer base and reduce dependency on few key accounts.',
-                    'icon': '⚠️'
+                    'icon': ICON_WARNING
                 })
             else:
                 customer_insights.append({
@@ -244,82 +530,81 @@ class InsightsGenerator:
         
         return customer_insights
     
-    def _generate_recommendations(self, metrics: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Generate actionable business recommendations."""
-        recommendations = []
+    def _generate_recommendations(self, metrics: Dict[str, Any], ctx: _InsightContext) -> PrioritizedList:
+        """Generate actionable business recommendations, grouped by priority."""
+        recommendations = PrioritizedList(itemgetter('priority'))
         
         # Sales-based recommendations
-        sales_change = metrics['changes']['sales_change']
+        sales_change = ctx.sales_change
         if sales_change < -5:
             recommendations.append({
-                'priority': 'High',
+                'priority': LEVEL_HIGH,
                 'category': 'Sales Recovery',
                 'title': 'Implement Sales Recovery Plan',
                 'description': 'Sales have declined significantly. Consider promotional campaigns, customer outreach, or market analysis.',
-                'expected_impact': 'High',
+                'expected_impact': LEVEL_HIGH,
                 'timeline': '1-2 weeks',
                 'icon': '🚨'
             })
         elif sales_change > 10:
             recommendations.append({
-                'priority': 'Medium',
+                'priority': LEVEL_MEDIUM,
                 'category': 'Growth Optimization',
                 'title': 'Scale Successful Strategies',
                 'description': 'Strong sales growth achieved. Identify and replicate successful strategies to sustain momentum.',
-                'expected_impact': 'High',
+                'expected_impact': LEVEL_HIGH,
                 'timeline': '2-4 weeks',
                 'icon': '🚀'
             })
         
         # Order-based recommendations
-        orders_change = metrics['changes']['orders_change']
-        aov_change = metrics['aov']['change']
+        orders_change = ctx.orders_change
+        aov_change = ctx.aov_change
         
         if orders_change < 0 and aov_change > 0:
             recommendations.append({
-                'priority': 'Medium',
+                'priority': LEVEL_MEDIUM,
                 'category': 'Customer Acquisition',
                 'title': 'Focus on Customer Acquisition',
                 'description': 'Fewer orders but higher AOV suggests need for broader customer reach while maintaining quality.',
-                'expected_impact': 'Medium',
+                'expected_impact': LEVEL_MEDIUM,
                 'timeline': '3-4 weeks',
                 'icon': '🎯'
             })
         elif orders_change > 0 and aov_change < 0:
             recommendations.append({
-                'priority': 'Medium',
+                'priority': LEVEL_MEDIUM,
                 'category': 'Revenue Optimization',
                 'title': 'Implement Upselling Strategies',
                 'description': 'More orders but lower AOV. Consider product bundling, premium options, or cross-selling.',
-                'expected_impact': 'Medium',
+                'expected_impact': LEVEL_MEDIUM,
                 'timeline': '2-3 weeks',
                 'icon': '💰'
             })
         
         # Product recommendations
-        if 'products' in metrics:
-            unique_products = metrics['products']['unique_products_count']
+        if ctx.products is not None:
+            unique_products = ctx.products.unique_count
             if unique_products < 3:
                 recommendations.append({
-                    'priority': 'Low',
+                    'priority': LEVEL_LOW,
                     'category': 'Product Strategy',
                     'title': 'Diversify Product Portfolio',
                     'description': 'Limited product variety in top performers. Analyze market opportunities for expansion.',
-                    'expected_impact': 'Medium',
+                    'expected_impact': LEVEL_MEDIUM,
                     'timeline': '4-8 weeks',
                     'icon': '📦'
                 })
         
         # Trend-based recommendations
-        if 'trends' in metrics and metrics['trends'].get('status') != 'insufficient_data':
-            trends = metrics['trends']
-            if trends['sales_volatility'] > 0.2:
+        if ctx.trends is not None:
+            if ctx.sales_volatility_level >= VOLATILITY_ELEVATED:
                 recommendations.append({
-                    'priority': 'Medium',
+                    'priority': LEVEL_MEDIUM,
                     'category': 'Business Stability',
                     'title': 'Reduce Business Volatility',
                     'description': 'High sales volatility detected. Review operational processes and market factors.',
-                    'expected_impact': 'High',
+                    'expected_impact': LEVEL_HIGH,
                     'timeline': '4-6 weeks',
                     'icon': '⚖️'
                 })
@@ -329,195 +614,189 @@ class InsightsGenerator:
             growth_rate = metrics['historical']['sales_growth_rate']
             if 0 < growth_rate < 5:
                 recommendations.append({
-                    'priority': 'Low',
+                    'priority': LEVEL_LOW,
                     'category': 'Growth Acceleration',
                     'title': 'Accelerate Growth Initiatives',
                     'description': 'Moderate growth rate suggests room for improvement. Consider market expansion or innovation.',
-                    'expected_impact': 'Medium',
+                    'expected_impact': LEVEL_MEDIUM,
                     'timeline': '6-12 weeks',
-                    'icon': '📈'
+                    'icon': ICON_UP
                 })
         
         return recommendations
     
-    def _identify_risks(self, metrics: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Identify potential business risks from the data."""
-        risks = []
+    def _identify_risks(self, metrics: Dict[str, Any], ctx: _InsightContext) -> PrioritizedList:
+        """Identify potential business risks from the data, grouped by level."""
+        risks = PrioritizedList(attrgetter('level'))
         
         # Performance risks
-        sales_change = metrics['changes']['sales_change']
-        orders_change = metrics['changes']['orders_change']
+        sales_change = ctx.sales_change
+        orders_change = ctx.orders_change
         
         if sales_change < -10:
-            risks.append({
-                'level': 'High',
-                'category': 'Revenue Risk',
-                'description': f'Significant sales decline of {abs(sales_change):.1f}% poses immediate revenue risk.',
-                'mitigation': 'Immediate action required: analyze root causes and implement corrective measures.',
-                'icon': '🚨'
-            })
+            risks.append(RiskAlert(
+                level=LEVEL_HIGH,
+                category='Revenue Risk',
+                description=f'Significant sales decline of {abs(sales_change):.1f}% poses immediate revenue risk.',
+                mitigation='Immediate action required: analyze root causes and implement corrective measures.',
+                icon='🚨'
+            ))
         
         if orders_change < -15:
-            risks.append({
-                'level': 'High',
-                'category': 'Demand Risk',
-                'description': f'Sharp decline in orders ({abs(orders_change):.1f}%) indicates potential demand issues.',
-                'mitigation': 'Review market conditions, customer feedback, and competitive landscape.',
-                'icon': '⚠️'
-            })
+            risks.append(RiskAlert(
+                level=LEVEL_HIGH,
+                category='Demand Risk',
+                description=f'Sharp decline in orders ({abs(orders_change):.1f}%) indicates potential demand issues.',
+                mitigation='Review market conditions, customer feedback, and competitive landscape.',
+                icon=ICON_WARNING
+            ))
         
         # Customer concentration risk
-        if 'customers' in metrics:
-            unique_customers = metrics['customers']['unique_customers_count']
+        if ctx.customers is not None:
+            unique_customers = ctx.customers.unique_count
             if unique_customers < 3:
-                risks.append({
-                    'level': 'Medium',
-                    'category': 'Customer Risk',
-                    'description': f'High customer concentration with only {unique_customers} key customers creates dependency risk.',
-                    'mitigation': 'Diversify customer base and strengthen relationships with existing customers.',
-                    'icon': '👥'
-                })
+                risks.append(RiskAlert(
+                    level=LEVEL_MEDIUM,
+                    category='Customer Risk',
+                    description=f'High customer concentration with only {unique_customers} key customers creates dependency risk.',
+                    mitigation='Diversify customer base and strengthen relationships with existing customers.',
+                    icon='👥'
+                ))
         
         # Product concentration risk
-        if 'products' in metrics:
-            unique_products = metrics['products']['unique_products_count']
+        if ctx.products is not None:
+            unique_products = ctx.products.unique_count
             if unique_products < 3:
-                risks.append({
-                    'level': 'Medium',
-                    'category': 'Product Risk',
-                    'description': f'Limited product diversity with only {unique_products} top performers.',
-                    'mitigation': 'Expand product portfolio or improve performance of existing products.',
-                    'icon': '📦'
-                })
+                risks.append(RiskAlert(
+                    level=LEVEL_MEDIUM,
+                    category='Product Risk',
+                    description=f'Limited product diversity with only {unique_products} top performers.',
+                    mitigation='Expand product portfolio or improve performance of existing products.',
+                    icon='📦'
+                ))
         
         # Volatility risk
-        if 'trends' in metrics and metrics['trends'].get('status') != 'insufficient_data':
-            if metrics['trends']['sales_volatility'] > 0.3:
-                risks.append({
-                    'level': 'Medium',
-                    'category': 'Volatility Risk',
-                    'description': 'High business volatility creates unpredictable performance patterns.',
-                    'mitigation': 'Implement stabilization measures and improve forecasting capabilities.',
-                    'icon': '📊'
-                })
+        if ctx.trends is not None:
+            if ctx.sales_volatility_level >= VOLATILITY_HIGH:
+                risks.append(RiskAlert(
+                    level=LEVEL_MEDIUM,
+                    category='Volatility Risk',
+                    description='High business volatility creates unpredictable performance patterns.',
+                    mitigation='Implement stabilization measures and improve forecasting capabilities.',
+                    icon='📊'
+                ))
         
         return risks
     
-    def _identify_opportunities(self, metrics: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Identify business opportunities from the data."""
-        opportunities = []
+    def _identify_opportunities(self, metrics: Dict[str, Any], ctx: _InsightContext) -> PrioritizedList:
+        """Identify business opportunities from the data, grouped by potential."""
+        opportunities = PrioritizedList(attrgetter('potential'))
         
         # Growth opportunities
-        sales_change = metrics['changes']['sales_change']
-        orders_change = metrics['changes']['orders_change']
-        aov_change = metrics['aov']['change']
+        sales_change = ctx.sales_change
+        orders_change = ctx.orders_change
+        aov_change = ctx.aov_change
         
         if sales_change > 5 and orders_change > 5:
-            opportunities.append({
-                'potential': 'High',
-                'category': 'Market Expansion',
-                'description': 'Strong performance in both sales and orders suggests market opportunity for expansion.',
-                'action': 'Consider scaling operations, expanding territory, or increasing marketing investment.',
-                'icon': '🚀'
-            })
+            opportunities.append(Opportunity(
+                potential=LEVEL_HIGH,
+                category='Market Expansion',
+                description='Strong performance in both sales and orders suggests market opportunity for expansion.',
+                action='Consider scaling operations, expanding territory, or increasing marketing investment.',
+                icon='🚀'
+            ))
         
         if aov_change > 10:
-            opportunities.append({
-                'potential': 'Medium',
-                'category': 'Premium Strategy',
-                'description': f'AOV increased by {aov_change:.1f}%, indicating customer willingness to pay premium prices.',
-                'action': 'Explore premium product lines or value-added services.',
-                'icon': '💎'
-            })
+            opportunities.append(Opportunity(
+                potential=LEVEL_MEDIUM,
+                category='Premium Strategy',
+                description=f'AOV increased by {aov_change:.1f}%, indicating customer willingness to pay premium prices.',
+                action='Explore premium product lines or value-added services.',
+                icon='💎'
+            ))
         
         # Product opportunities
-        if 'products' in metrics:
-            current_product = metrics['products']['current_top_product']
-            opportunities.append({
-                'potential': 'Medium',
-                'category': 'Product Development',
-                'description': f'{current_product} is performing well as current top product.',
-                'action': f'Analyze {current_product} success factors and apply to other products or develop complementary offerings.',
-                'icon': '⭐'
-            })
+        if ctx.products is not None:
+            current_product = ctx.products.current
+            opportunities.append(Opportunity(
+                potential=LEVEL_MEDIUM,
+                category='Product Development',
+                description=f'{current_product} is performing well as current top product.',
+                action=f'Analyze {current_product} success factors and apply to other products or develop complementary offerings.',
+                icon='⭐'
+            ))
         
         # Customer opportunities
-        if 'customers' in metrics:
-            current_customer = metrics['customers']['current_top_customer']
-            opportunities.append({
-                'potential': 'Medium',
-                'category': 'Customer Success',
-                'description': f'{current_customer} is the current top customer showing strong engagement.',
-                'action': f'Study {current_customer} relationship model and replicate with other customers.',
-                'icon': '🏆'
-            })
+        if ctx.customers is not None:
+            current_customer = ctx.customers.current
+            opportunities.append(Opportunity(
+                potential=LEVEL_MEDIUM,
+                category='Customer Success',
+                description=f'{current_customer} is the current top customer showing strong engagement.',
+                action=f'Study {current_customer} relationship model and replicate with other customers.',
+                icon='🏆'
+            ))
         
         # Trend opportunities
-        if 'trends' in metrics and metrics['trends'].get('status') != 'insufficient_data':
-            if metrics['trends']['sales_trend_direction'] == 'increasing':
-                opportunities.append({
-                    'potential': 'High',
-                    'category': 'Momentum Capture',
-                    'description': 'Positive sales trend provides opportunity to accelerate growth.',
-                    'action': 'Increase investment in successful channels and strategies while trend continues.',
-                    'icon': '📈'
-                })
+        if ctx.trends is not None:
+            if ctx.trends['sales_trend_direction'] == 'increasing':
+                opportunities.append(Opportunity(
+                    potential=LEVEL_HIGH,
+                    category='Momentum Capture',
+                    description='Positive sales trend provides opportunity to accelerate growth.',
+                    action='Increase investment in successful channels and strategies while trend continues.',
+                    icon=ICON_UP
+                ))
         
         return opportunities
     
+    def score_metrics(self, sales_changes, orders_changes, aov_changes) -> Dict[str, Dict[str, List[str]]]:
+        """Classify many weeks of % changes at once (e.g. for backfills).
+        
+        Returns qualifier and status labels per metric, in input order; the labels match
+        _get_performance_qualifier and _get_status_level for each value.
+        """
+        scores = {}
+        for name, changes in (('sales', sales_changes), ('orders', orders_changes), ('aov', aov_changes)):
+            qualifier_codes, status_codes = classify_changes(changes, QUALIFIER_THRESHOLDS, STATUS_THRESHOLDS)
+            scores[name] = {
+                'qualifier': [QUALIFIER_LABELS[code] for code in qualifier_codes.tolist()],
+                'status': [STATUS_LABELS[code] for code in status_codes.tolist()]
+            }
+        return scores
+    
     def _get_performance_qualifier(self, change: float) -> str:
         """Get performance qualifier based on percentage change."""
-        if abs(change) >= 20:
-            return "dramatically"
-        elif abs(change) >= 10:
-            return "significantly"
-        elif abs(change) >= 5:
-            return "moderately"
-        else:
-            return "slightly"
+        if math.isnan(change):  # No comparable previous week; bisect would rank NaN highest
+            return QUALIFIER_LABELS[0]
+        return QUALIFIER_LABELS[bisect_right(QUALIFIER_THRESHOLDS, abs(change))]
     
     def _get_status_level(self, change: float) -> str:
         """Get status level based on performance change."""
-        if change >= 10:
-            return "excellent"
-        elif change >= 5:
-            return "good" 
-        elif change >= 0:
-            return "fair"
-        elif change >= -5:
-            return "concerning"
-        else:
-            return "critical"
+        if math.isnan(change):
+            return STATUS_LABELS[0]
+        return STATUS_LABELS[bisect_right(STATUS_THRESHOLDS, change)]
     
-    def _get_sales_performance_message(self, change: float, metrics: Dict[str, Any]) -> str:
+    def _get_sales_performance_message(self, ctx: _InsightContext, metrics: Dict[str, Any]) -> str:
         """Generate sales performance message."""
-        current_sales = metrics['current_week']['sales']
-        qualifier = self._get_performance_qualifier(change)
-        
-        if change >= 0:
-            return f"Sales performance is strong with {qualifier} growth of {change:.1f}% to {self.config.METRICS_CONFIG['currency_symbol']}{current_sales:,.0f}."
-        else:
-            return f"Sales declined {qualifier} by {abs(change):.1f}% to {self.config.METRICS_CONFIG['currency_symbol']}{current_sales:,.0f}, requiring attention."
+        change = ctx.sales_change
+        template = SALES_UP_MESSAGE if change >= 0 else SALES_DOWN_MESSAGE
+        return template.format(qualifier=ctx.sales_qualifier, change=abs(change),
+                               currency=ctx.currency, value=metrics['current_week']['sales'])
     
-    def _get_orders_performance_message(self, change: float, metrics: Dict[str, Any]) -> str:
+    def _get_orders_performance_message(self, ctx: _InsightContext, metrics: Dict[str, Any]) -> str:
         """Generate orders performance message."""
-        current_orders = metrics['current_week']['orders']
-        qualifier = self._get_performance_qualifier(change)
-        
-        if change >= 0:
-            return f"Order volume shows {qualifier} improvement of {change:.1f}% to {current_orders:,} orders."
-        else:
-            return f"Order volume decreased {qualifier} by {abs(change):.1f}% to {current_orders:,} orders."
+        change = ctx.orders_change
+        template = ORDERS_UP_MESSAGE if change >= 0 else ORDERS_DOWN_MESSAGE
+        return template.format(qualifier=ctx.orders_qualifier, change=abs(change),
+                               value=metrics['current_week']['orders'])
     
-    def _get_aov_performance_message(self, change: float, metrics: Dict[str, Any]) -> str:
+    def _get_aov_performance_message(self, ctx: _InsightContext, metrics: Dict[str, Any]) -> str:
         """Generate AOV performance message."""
-        current_aov = metrics['aov']['current']
-        qualifier = self._get_performance_qualifier(change)
-        
-        if change >= 0:
-            return f"Average order value increased {qualifier} by {change:.1f}% to {self.config.METRICS_CONFIG['currency_symbol']}{current_aov:.0f}."
-        else:
-            return f"Average order value declined {qualifier} by {abs(change):.1f}% to {self.config.METRICS_CONFIG['currency_symbol']}{current_aov:.0f}."
+        change = ctx.aov_change
+        template = AOV_UP_MESSAGE if change >= 0 else AOV_DOWN_MESSAGE
+        return template.format(qualifier=ctx.aov_qualifier, change=abs(change),
+                               currency=ctx.currency, value=metrics['aov']['current'])
     
     def _get_trend_message(self, metric_type: str, direction: str, trends: Dict[str, Any]) -> str:
         """Generate trend message."""
@@ -530,50 +809,45 @@ class InsightsGenerator:
     
     def _assess_volatility(self, volatility: float) -> str:
         """Assess volatility level."""
-        if volatility > 0.3:
-            return "high"
-        elif volatility > 0.15:
-            return "moderate"
-        else:
-            return "low"
+        return VOLATILITY_LABELS[bisect_left(VOLATILITY_THRESHOLDS, volatility)]
     
-    def generate_insights_summary(self, insights: Dict[str, Any]) -> str:
+    def generate_insights_summary(self, insights: Mapping) -> str:
         """Generate a concise summary of all insights."""
-        summary_parts = []
+        buffer = io.StringIO()
+        write = buffer.write
         
         # Add executive summary
-        summary_parts.append("📊 EXECUTIVE SUMMARY")
-        summary_parts.append(insights['executive_summary'])
-        summary_parts.append("")
+        write("📊 EXECUTIVE SUMMARY\n")
+        write(insights['executive_summary'])
+        write("\n\n")
         
         # Add key performance highlights
         performance = insights['performance_analysis']
-        summary_parts.append("🎯 KEY PERFORMANCE HIGHLIGHTS")
+        write("🎯 KEY PERFORMANCE HIGHLIGHTS\n")
         for perf in performance[:3]:  # Top 3 performance insights
-            summary_parts.append(f"{perf['icon']} {perf['metric']}: {perf['message']}")
-        summary_parts.append("")
+            write(perf.icon); write(" "); write(perf.metric); write(": "); write(perf.message); write("\n")
+        write("\n")
         
         # Add top recommendations
         if insights['recommendations']:
-            summary_parts.append("💡 TOP RECOMMENDATIONS")
-            high_priority_recs = [r for r in insights['recommendations'] if r['priority'] == 'High']
-            for rec in high_priority_recs[:2]:  # Top 2 high priority
-                summary_parts.append(f"{rec['icon']} {rec['title']}: {rec['description']}")
-            summary_parts.append("")
+            write("💡 TOP RECOMMENDATIONS\n")
+            for rec in insights['recommendations'].by_level(LEVEL_HIGH)[:2]:  # Top 2 high priority
+                write(rec['icon']); write(" "); write(rec['title']); write(": "); write(rec['description']); write("\n")
+            write("\n")
         
         # Add critical risks
-        high_risks = [r for r in insights['risk_alerts'] if r['level'] == 'High']
+        high_risks = insights['risk_alerts'].by_level(LEVEL_HIGH)
         if high_risks:
-            summary_parts.append("⚠️ CRITICAL RISKS")
+            write("⚠️ CRITICAL RISKS\n")
             for risk in high_risks[:2]:  # Top 2 critical risks
-                summary_parts.append(f"{risk['icon']} {risk['category']}: {risk['description']}")
-            summary_parts.append("")
+                write(risk.icon); write(" "); write(risk.category); write(": "); write(risk.description); write("\n")
+            write("\n")
         
         # Add top opportunities
         if insights['opportunities']:
-            summary_parts.append("🚀 KEY OPPORTUNITIES")
-            high_potential_ops = [o for o in insights['opportunities'] if o['potential'] == 'High']
-            for opp in high_potential_ops[:2]:  # Top 2 high potential
-                summary_parts.append(f"{opp['icon']} {opp['category']}: {opp['description']}")
+            write("🚀 KEY OPPORTUNITIES\n")
+            for opp in insights['opportunities'].by_level(LEVEL_HIGH)[:2]:  # Top 2 high potential
+                write(opp.icon); write(" "); write(opp.category); write(": "); write(opp.description); write("\n")
         
-        return "\n".join(summary_parts)
\ No newline at end of file
+        # Every line is newline-terminated; the summary has no newline after its last line
+        return buffer.getvalue()[:-1]
\ No newline at end of file
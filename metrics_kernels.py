@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Metrics Kernels Module
+Fused numerical kernels for the trend and growth metrics.
+"""
+
+import numpy as np
+from typing import NamedTuple
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+class TrendStats(NamedTuple):
+    """Per-column trend statistics for sales and orders."""
+    sales_slope: float
+    orders_slope: float
+    sales_cv: float
+    orders_cv: float
+    sales_cagr: float
+    orders_cagr: float
+
+if NUMBA_AVAILABLE:
+    # error_model='numpy' keeps float division by zero returning inf/nan like pandas
+    @njit(cache=True, error_model='numpy')
+    def _column_stats(y):
+        n = y.size
+        sy = 0.0
+        for i in range(n):
+            sy += y[i]
+        mean = sy / n if n > 0 else 0.0
+
+        x_mean = (n - 1) / 2.0
+        sxx = 0.0
+        sxy = 0.0
+        ss = 0.0
+        for i in range(n):
+            dx = i - x_mean
+            dy = y[i] - mean
+            sxx += dx * dx
+            sxy += dx * dy
+            ss += dy * dy
+
+        slope = sxy / sxx if sxx > 0.0 else 0.0
+        cv = np.sqrt(ss / (n - 1)) / mean if n > 1 else np.nan
+
+        cagr = 0.0
+        if n >= 2 and y[0] > 0.0:
+            cagr = ((y[n - 1] / y[0]) ** (1.0 / (n - 1)) - 1.0) * 100.0
+        return slope, cv, cagr
+else:
+    def _column_stats(y):
+        n = y.size
+        if n < 2:
+            return 0.0, np.nan, 0.0
+        x = np.arange(n) - (n - 1) / 2.0
+        dy = y - y.mean()
+        slope = (x * dy).sum() / (x * x).sum()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cv = np.sqrt((dy * dy).sum() / (n - 1)) / y.mean()
+        cagr = ((y[-1] / y[0]) ** (1.0 / (n - 1)) - 1.0) * 100.0 if y[0] > 0 else 0.0
+        return slope, cv, cagr
+
+def compute_trend_stats(sales, orders) -> TrendStats:
+    """Compute slope, volatility and CAGR for sales and orders in one pass each."""
+    sales_slope, sales_cv, sales_cagr = _column_stats(np.ascontiguousarray(sales, dtype=np.float64))
+    orders_slope, orders_cv, orders_cagr = _column_stats(np.ascontiguousarray(orders, dtype=np.float64))
+    return TrendStats(sales_slope, orders_slope, sales_cv, orders_cv, sales_cagr, orders_cagr)
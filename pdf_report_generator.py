@@ -4,8 +4,12 @@ PDF Report Generator Module
 Creates professional, branded PDF reports with charts, tables, and insights.
 """
 
+import io
+import os
+import numpy as np
 import pandas as pd
-from pathlib import Path
+from PIL import Image as PILImage
+from functools import cached_property, lru_cache
 from datetime import datetime
 
 from reportlab.lib.pagesizes import A4
@@ -14,33 +18,127 @@ from reportlab.platypus import (
     SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
 )
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.graphics.charts.barcharts import VerticalBarChart
 from reportlab.graphics.shapes import Drawing
 from reportlab.graphics import renderPDF
 
+# Columns rendered in the report table; text columns are read as-is, skipping type inference
+TABLE_COLUMNS = ['Week_Start', 'Week_End', 'Total_Sales', 'Total_Orders', 'Top_Product', 'Top_Customer']
+CSV_DTYPES = {'Week_Start': str, 'Week_End': str, 'Top_Product': str, 'Top_Customer': str}
+
+PDF_WRITE_BUFFER = 1024 * 1024  # Output buffer size, so the PDF is written in few large writes
+TABLE_CHUNK_ROWS = 200  # Data rows per Table flowable; each chunk is laid out on its own
+TABLE_CELL_PADDING = 12  # ReportLab's default left + right cell padding
+
+# Report colors and the table style, built once and shared by every report
+HEADER_BACKGROUND = colors.HexColor("#003366")
+BAR_COLOR = colors.HexColor("#336699")
+TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), HEADER_BACKGROUND),
+    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("FONTSIZE", (0, 0), (-1, 0), 12),
+    ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+    ("GRID", (0, 0), (-1, -1), 1, colors.black),
+])
+
+LOGO_SIZE = (100, 50)  # Logo size on the page, in points
+LOGO_RASTER_SCALE = 3  # Pixels per point kept for the embedded logo (~216 dpi)
+
+
+@lru_cache(maxsize=8)
+def _read_csv_cached(csv_path: str, mtime: float) -> pd.DataFrame:
+    """Parse a CSV once per (path, modification time)."""
+    return pd.read_csv(csv_path, usecols=TABLE_COLUMNS, dtype=CSV_DTYPES, engine='c', memory_map=True)
+
+
+@lru_cache(maxsize=4)
+def _logo_png(logo_path: str, mtime: float) -> bytes:
+    """Decode the logo once per (path, modification time) and downscale it to print size, as PNG bytes."""
+    width, height = (side * LOGO_RASTER_SCALE for side in LOGO_SIZE)
+    with PILImage.open(logo_path) as logo:
+        if logo.width > width or logo.height > height:
+            logo = logo.resize((width, height), PILImage.LANCZOS)
+        buffer = io.BytesIO()
+        logo.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def load_csv(csv_path: str) -> pd.DataFrame:
+    """Return the parsed CSV, reusing the last parse while the file is unchanged.
+
+    The DataFrame is shared between callers, so it must not be modified.
+    """
+    return _read_csv_cached(str(csv_path), os.path.getmtime(csv_path))
+
 
 class PDFReportGenerator:
     """Creates professional PDF business reports with comprehensive formatting."""
 
-    def __init__(self, csv_path: str, output_path: str, logo_path: str = None):
+    def __init__(self, csv_path: str, output_path: str, logo_path: str = None,
+                 data: pd.DataFrame = None):
         self.csv_path = csv_path
         self.output_path = output_path
         self.logo_path = logo_path
-        self.data = pd.read_csv(csv_path)
+        self.data = data if data is not None else load_csv(csv_path)
         self.styles = getSampleStyleSheet()
+        self._logo = self._load_logo(logo_path)
+
+    @staticmethod
+    def _load_logo(logo_path):
+        """Return the prepared logo PNG bytes, or None when there is no logo file (one stat)."""
+        if not logo_path:
+            return None
+        try:
+            mtime = os.path.getmtime(logo_path)
+        except OSError:
+            return None
+        return _logo_png(str(logo_path), mtime)
+
+    @classmethod
+    def from_dataframe(cls, data: pd.DataFrame, output_path: str, logo_path: str = None):
+        """Create a generator for already loaded data, without reading a CSV."""
+        return cls(None, output_path, logo_path, data=data)
+
+    @cached_property
+    def sales(self) -> np.ndarray:
+        return self.data["Total_Sales"].to_numpy(dtype=np.float64)
+
+    @cached_property
+    def total_sales(self) -> float:
+        return float(np.nansum(self.sales))  # NaN-skipping, like Series.sum()
+
+    @cached_property
+    def avg_sales(self) -> float:
+        return float(np.nanmean(self.sales))
+
+    @cached_property
+    def sales_values(self) -> list:
+        return self.sales.tolist()
+
+    @cached_property
+    def week_labels(self) -> list:
+        return [f"W{week}" for week in range(1, len(self.data) + 1)]
+
+    def _column_widths(self) -> list:
+        """Fixed column widths from each column's widest entry, so ReportLab skips auto-sizing."""
+        text = self.data.astype(str)
+        widths = []
+        for column in text.columns:
+            cells = text[column]
+            widest = cells.iloc[cells.str.len().to_numpy().argmax()] if len(cells) else ""
+            widths.append(max(stringWidth(str(column), "Helvetica-Bold", 12),
+                              stringWidth(widest, "Helvetica", 10)) + TABLE_CELL_PADDING)
+        return widths
 
     def generate(self):
-        doc = SimpleDocTemplate(
-            self.output_path, pagesize=A4,
-            rightMargin=30, leftMargin=30,
-            topMargin=30, bottomMargin=18
-        )
-
         elements = []
 
         # Optional Logo
-        if self.logo_path and Path(self.logo_path).exists():
-            elements.append(Image(self.logo_path, width=100, height=50))
+        if self._logo is not None:
+            elements.append(Image(io.BytesIO(self._logo), width=LOGO_SIZE[0], height=LOGO_SIZE[1]))
             elements.append(Spacer(1, 12))
 
         # Title
@@ -56,18 +154,13 @@ class PDFReportGenerator:
         elements.append(Spacer(1, 12))
 
         # Table
-        table_data = [list(self.data.columns)] + self.data.values.tolist()
-        table = Table(table_data, repeatRows=1)
-        table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#003366")),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("FONTSIZE", (0, 0), (-1, 0), 12),
-            ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-            ("GRID", (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(table)
+        # One object-array conversion boxes every cell in C, in a single pass
+        header = self.data.columns.tolist()
+        rows = self.data.to_numpy(dtype=object).tolist()
+        col_widths = self._column_widths()
+        for start in range(0, max(len(rows), 1), TABLE_CHUNK_ROWS):
+            elements.append(Table([header, *rows[start:start + TABLE_CHUNK_ROWS]], colWidths=col_widths,
+                                  repeatRows=1, style=TABLE_STYLE))
         elements.append(Spacer(1, 20))
 
         # Chart
@@ -77,27 +170,30 @@ class PDFReportGenerator:
         chart.y = 50
         chart.height = 125
         chart.width = 300
-        chart.data = [list(self.data["Total_Sales"])]
-        chart.categoryAxis.categoryNames = [
-            f"W{i+1}" for i in range(len(self.data))
-        ]
-        chart.bars[0].fillColor = colors.HexColor("#336699")
+        chart.data = [self.sales_values]
+        chart.categoryAxis.categoryNames = self.week_labels
+        chart.bars[0].fillColor = BAR_COLOR
         drawing.add(chart)
         elements.append(drawing)
         elements.append(Spacer(1, 20))
 
         # Summary
-        total_sales = self.data["Total_Sales"].sum()
-        avg_sales = self.data["Total_Sales"].mean()
         summary_text = f"""
         <b>Summary:</b><br/>
-        Total Sales: ${total_sales:,.2f}<br/>
-        Average Weekly Sales: ${avg_sales:,.2f}
+        Total Sales: ${self.total_sales:,.2f}<br/>
+        Average Weekly Sales: ${self.avg_sales:,.2f}
         """
         elements.append(Paragraph(summary_text, self.styles["Normal"]))
 
         # Build PDF
-        doc.build(elements)
+        with open(self.output_path, 'wb', buffering=PDF_WRITE_BUFFER) as output:
+            doc = SimpleDocTemplate(
+                output, pagesize=A4,
+                rightMargin=30, leftMargin=30,
+                topMargin=30, bottomMargin=18,
+                pageCompression=1  # Flate-compress page content streams
+            )
+            doc.build(elements)
         print(f"✅ PDF report generated: {self.output_path}")
 
 
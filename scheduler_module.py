@@ -4,18 +4,69 @@ Scheduler Module
 Handles automated scheduling and execution of report generation.
 """
 
-import schedule
+import heapq
+import itertools
+import os
+import re
 import time
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from datetime import date, datetime, timedelta
+from functools import cached_property, lru_cache
+from typing import Callable, Dict, Any, List, Optional, Tuple, Union, TYPE_CHECKING
 import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 import signal
 import sys
 
 from config import get_config
-from main import BusinessReportGenerator
 
+if TYPE_CHECKING:
+    from main import BusinessReportGenerator, SystemTestResults
+
+MAX_IDLE_SECONDS = 3600  # Longest wait between schedule checks, even when no job is due sooner
+ERROR_RETRY_SECONDS = 300  # Wait after a scheduler error before retrying
+SECONDS_PER_WEEK = 604800
+
+# Report files are named ..._YYYY-MM-DD.pdf and logs ..._YYYYMMDD.log
+FILENAME_DATE_PATTERN = re.compile(r'(\d{4})-?(\d{2})-?(\d{2})')
+
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+
+@lru_cache(maxsize=64)
+def _first_monday(year: int, month: int) -> date:
+    """Get the first Monday of a given month."""
+    first_day = date(year, month, 1)
+    return first_day + timedelta(days=(7 - first_day.weekday()) % 7)  # Monday is 0
+
+def _parse_date_from_name(name: str) -> Optional[date]:
+    """Return the date embedded in a file name, or None if it has none."""
+    match = FILENAME_DATE_PATTERN.search(name)
+    if not match:
+        return None
+    try:
+        return date(*map(int, match.groups()))
+    except ValueError:
+        return None
+
+class ScheduledJob:
+    """A job that runs at a fixed local time, either daily or on one weekday."""
+    
+    def __init__(self, job_func: Callable[[], Any], at_time: str, weekday: Optional[int] = None):
+        self.job_func = job_func
+        self.at_time = datetime.strptime(at_time, '%H:%M').time()
+        self.weekday = weekday  # Monday is 0; None runs every day
+        self.interval = 'daily' if weekday is None else f"weekly on {WEEKDAYS[weekday]}"
+        self.next_run = self.next_run_after(datetime.now())
+        
+    def next_run_after(self, moment: datetime) -> datetime:
+        """Get the first run time strictly after the given moment."""
+        candidate = datetime.combine(moment.date(), self.at_time)
+        if self.weekday is not None:
+            candidate += timedelta(days=(self.weekday - moment.weekday()) % 7)
+        if candidate <= moment:
+            candidate += timedelta(days=1 if self.weekday is None else 7)
+        return candidate
+        
 class ReportScheduler:
     """Handles automated scheduling of report generation."""
     
@@ -23,14 +74,32 @@ class ReportScheduler:
         """Initialize the scheduler."""
         self.config = config or get_config()
         self.logger = logging.getLogger(__name__)
-        self.generator = BusinessReportGenerator(self.config)
         self.running = False
-        self.scheduler_thread = None
+        
+        # Settings read on every job run; configuration is fixed after startup
+        self._auto_email = self.config.AUTOMATION_CONFIG.get('auto_email', True)
+        self._send_error_alerts = self.config.EMAIL_CONFIG.get('send_error_alerts', True)
+        self._send_health_alerts = self.config.EMAIL_CONFIG.get('send_health_alerts', False)
+        self._currency = self.config.METRICS_CONFIG['currency_symbol']
+        
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._future: Optional[Future] = None
+        self._job_pool: Optional[ThreadPoolExecutor] = None  # Runs job bodies off the scheduler thread
+        self._wake = threading.Event()  # Set to interrupt the scheduler's wait (e.g. on stop)
+        self._jobs: List[ScheduledJob] = []
+        self._heap: List[Tuple[datetime, int, ScheduledJob]] = []  # (next_run, sequence, job)
+        self._sequence = itertools.count()  # Tie-breaker so jobs due at the same time never compare
         
         # Setup signal handlers for graceful shutdown
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
         
+    @cached_property
+    def generator(self) -> 'BusinessReportGenerator':
+        # Imported on first use so --status does not load the reporting stack
+        from main import BusinessReportGenerator
+        return BusinessReportGenerator(self.config)
+        
     def setup_schedule(self):
         """Setup the report generation schedule."""
         if not self.config.AUTOMATION_CONFIG['schedule_enabled']:
@@ -40,26 +109,15 @@ class ReportScheduler:
         schedule_day = self.config.AUTOMATION_CONFIG['schedule_day']
         schedule_time = self.config.AUTOMATION_CONFIG['schedule_time']
         
-        self.logger.info(f"Setting up schedule: {schedule_day} at {schedule_time}")
-        
-        # Map day names to schedule methods
-        day_mapping = {
-            'monday': schedule.every().monday,
-            'tuesday': schedule.every().tuesday,
-            'wednesday': schedule.every().wednesday,
-            'thursday': schedule.every().thursday,
-            'friday': schedule.every().friday,
-            'saturday': schedule.every().saturday,
-            'sunday': schedule.every().sunday,
-            'daily': schedule.every().day
-        }
+        self.logger.info("Setting up schedule: %s at %s", schedule_day, schedule_time)
         
-        if schedule_day.lower() in day_mapping:
-            scheduled_job = day_mapping[schedule_day.lower()].at(schedule_time)
-            scheduled_job.do(self._run_scheduled_report)
-            self.logger.info(f"Scheduled weekly report for {schedule_day} at {schedule_time}")
+        day = schedule_day.lower()
+        if day == 'daily' or day in WEEKDAYS:
+            weekday = None if day == 'daily' else WEEKDAYS.index(day)
+            self._schedule_job(self._run_scheduled_report, schedule_time, weekday)
+            self.logger.info("Scheduled weekly report for %s at %s", schedule_day, schedule_time)
         else:
-            self.logger.error(f"Invalid schedule day: {schedule_day}")
+            self.logger.error("Invalid schedule day: %s", schedule_day)
             return
         
         # Add additional schedules if needed
@@ -68,14 +126,47 @@ class ReportScheduler:
     def _setup_additional_schedules(self):
         """Setup additional scheduled tasks."""
         # Monthly summary report (first Monday of each month)
-        schedule.every().monday.at("10:00").do(self._run_monthly_report)
+        self._schedule_job(self._run_monthly_report, "10:00", WEEKDAYS.index('monday'))
         
         # Daily health check (if enabled)
         if self.config.AUTOMATION_CONFIG.get('daily_health_check', False):
-            schedule.every().day.at("08:00").do(self._run_health_check)
+            self._schedule_job(self._run_health_check, "08:00")
         
         # Weekly cleanup (every Sunday)
-        schedule.every().sunday.at("23:00").do(self._run_cleanup)
+        self._schedule_job(self._run_cleanup, "23:00", WEEKDAYS.index('sunday'))
+        
+    def _schedule_job(self, job_func: Callable[[], Any], at_time: str, weekday: Optional[int] = None):
+        """Register a job and queue its first run."""
+        job = ScheduledJob(job_func, at_time, weekday)
+        self._jobs.append(job)
+        self._push(job)
+        
+    def _push(self, job: ScheduledJob):
+        """Queue a job on the run heap at its next run time."""
+        heapq.heappush(self._heap, (job.next_run, next(self._sequence), job))
+        
+    def _run_due_jobs(self):
+        """Hand every job whose next run time has passed to the job pool, then requeue it."""
+        while self._heap and self._heap[0][0] <= datetime.now():
+            _, _, job = heapq.heappop(self._heap)
+            try:
+                self._job_pool.submit(self._dispatch, job.job_func)
+            finally:
+                job.next_run = job.next_run_after(datetime.now())
+                self._push(job)
+                
+    def _dispatch(self, job_func: Callable[[], Any]):
+        """Run a job body on the job pool, logging anything it raises."""
+        try:
+            job_func()
+        except Exception as e:
+            self.logger.error("Scheduled job %s failed: %s", job_func.__name__, e, exc_info=True)
+                
+    def _idle_seconds(self) -> Optional[float]:
+        """Seconds until the earliest queued job is due, or None if nothing is queued."""
+        if not self._heap:
+            return None
+        return (self._heap[0][0] - datetime.now()).total_seconds()
         
     def _run_scheduled_report(self):
         """Execute the scheduled report generation."""
@@ -84,30 +175,32 @@ class ReportScheduler:
         try:
             results = self.generator.generate_complete_report(
                 use_sample_data=False,  # Use real data for scheduled reports
-                send_email=self.config.AUTOMATION_CONFIG.get('auto_email', True),
+                send_email=self._auto_email,
                 create_summary=True
             )
             
-            if results['success']:
+            if results.success:
                 self.logger.info("✅ Scheduled report generated successfully")
                 
-                # Log key metrics
-                if 'metrics' in results:
-                    metrics = results['metrics']
+                # Log key metrics (thousands separators need format(), so skip it when INFO is off)
+                if results.metrics and self.logger.isEnabledFor(logging.INFO):
+                    metrics = results.metrics
                     self.logger.info(
-                        f"📊 Report metrics - Sales: {self.config.METRICS_CONFIG['currency_symbol']}{metrics['current_week']['sales']:,.0f} "
-                        f"({metrics['changes']['sales_change']:+.1f}%), "
-                        f"Orders: {metrics['current_week']['orders']:,} "
-                        f"({metrics['changes']['orders_change']:+.1f}%)"
+                        "📊 Report metrics - Sales: %s%s (%+.1f%%), Orders: %s (%+.1f%%)",
+                        self._currency,
+                        format(metrics['current_week']['sales'], ',.0f'),
+                        metrics['changes']['sales_change'],
+                        format(metrics['current_week']['orders'], ','),
+                        metrics['changes']['orders_change']
                     )
             else:
-                self.logger.error(f"❌ Scheduled report failed: {results.get('error', 'Unknown error')}")
+                self.logger.error("❌ Scheduled report failed: %s", results.error or 'Unknown error')
                 
                 # Send error notification
-                self._send_error_notification(results.get('error', 'Unknown error'))
+                self._send_error_notification(results.error or 'Unknown error')
                 
         except Exception as e:
-            self.logger.error(f"Exception in scheduled report: {e}", exc_info=True)
+            self.logger.error("Exception in scheduled report: %s", e, exc_info=True)
             self._send_error_notification(str(e))
             
     def _run_monthly_report(self):
@@ -115,9 +208,7 @@ class ReportScheduler:
         today = datetime.now()
         
         # Check if this is the first Monday of the month
-        first_monday = self._get_first_monday_of_month(today.year, today.month)
-        
-        if today.date() == first_monday:
+        if today.date() == _first_monday(today.year, today.month):
             self.logger.info("📅 Generating monthly summary report...")
             
             try:
@@ -129,11 +220,11 @@ class ReportScheduler:
                     create_summary=True
                 )
                 
-                if results['success']:
+                if results.success:
                     self.logger.info("✅ Monthly report generated successfully")
                     
             except Exception as e:
-                self.logger.error(f"❌ Monthly report failed: {e}")
+                self.logger.error("❌ Monthly report failed: %s", e)
                 
     def _run_health_check(self):
         """Run daily system health check."""
@@ -142,17 +233,17 @@ class ReportScheduler:
         try:
             test_results = self.generator.test_system()
             
-            if test_results['overall_status'] != 'passed':
+            if test_results.overall_status != 'passed':
                 self.logger.warning("⚠️ System health check revealed issues")
                 
                 # Send health alert if configured
-                if self.config.EMAIL_CONFIG.get('send_health_alerts', False):
+                if self._send_health_alerts:
                     self._send_health_alert(test_results)
             else:
                 self.logger.info("✅ System health check passed")
                 
         except Exception as e:
-            self.logger.error(f"❌ Health check failed: {e}")
+            self.logger.error("❌ Health check failed: %s", e)
             
     def _run_cleanup(self):
         """Run weekly cleanup tasks."""
@@ -171,50 +262,50 @@ class ReportScheduler:
             self.logger.info("✅ Cleanup completed")
             
         except Exception as e:
-            self.logger.error(f"❌ Cleanup failed: {e}")
+            self.logger.error("❌ Cleanup failed: %s", e)
             
     def _cleanup_old_reports(self, keep_weeks: int = 12):
         """Clean up old report files."""
-        cutoff_date = datetime.now() - timedelta(weeks=keep_weeks)
-        reports_dir = self.config.OUTPUT_DIR
-        
-        removed_count = 0
-        for report_file in reports_dir.glob('*.pdf'):
-            if report_file.stat().st_mtime < cutoff_date.timestamp():
-                report_file.unlink()
-                removed_count += 1
+        removed_count = self._remove_files_older_than(self.config.OUTPUT_DIR, '.pdf', keep_weeks)
                 
         if removed_count > 0:
-            self.logger.info(f"Removed {removed_count} old report files")
+            self.logger.info("Removed %d old report files", removed_count)
             
     def _cleanup_old_logs(self, keep_weeks: int = 4):
         """Clean up old log files."""
-        cutoff_date = datetime.now() - timedelta(weeks=keep_weeks)
-        logs_dir = self.config.LOGS_DIR
-        
-        removed_count = 0
-        for log_file in logs_dir.glob('*.log'):
-            if log_file.stat().st_mtime < cutoff_date.timestamp():
-                log_file.unlink()
-                removed_count += 1
+        removed_count = self._remove_files_older_than(self.config.LOGS_DIR, '.log', keep_weeks)
                 
         if removed_count > 0:
-            self.logger.info(f"Removed {removed_count} old log files")
-            
-    def _get_first_monday_of_month(self, year: int, month: int) -> datetime.date:
-        """Get the first Monday of a given month."""
-        first_day = datetime(year, month, 1)
-        
-        # Find the first Monday
-        days_ahead = 0 - first_day.weekday()  # Monday is 0
-        if days_ahead <= 0:  # Target day already happened this week
-            days_ahead += 7
+            self.logger.info("Removed %d old log files", removed_count)
             
-        return (first_day + timedelta(days=days_ahead)).date()
+    def _remove_files_older_than(self, directory, suffix: Union[str, Tuple[str, ...]], keep_weeks: int) -> int:
+        """Delete files with the given suffix older than keep_weeks in a single directory pass."""
+        cutoff_ts = time.time() - keep_weeks * SECONDS_PER_WEEK
+        cutoff_date = date.fromtimestamp(cutoff_ts)
         
+        removed_count = 0
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                # d_type from the directory listing answers is_file() without a stat call
+                if not (entry.name.endswith(suffix) and entry.is_file(follow_symlinks=False)):
+                    continue
+                
+                # Dated file names answer the age question without a stat call
+                file_date = _parse_date_from_name(entry.name)
+                if file_date is not None:
+                    expired = file_date < cutoff_date
+                else:
+                    expired = entry.stat(follow_symlinks=False).st_mtime < cutoff_ts
+                    
+                if expired:
+                    os.unlink(entry.path)
+                    removed_count += 1
+                    
+        return removed_count
+            
     def _send_error_notification(self, error_message: str):
         """Send error notification email."""
-        if self.config.EMAIL_CONFIG.get('send_error_alerts', True):
+        if self._send_error_alerts:
             try:
                 alert_message = f"The scheduled report generation failed with the following error: {error_message}"
                 self.generator.email_sender.send_alert_email(
@@ -223,13 +314,12 @@ class ReportScheduler:
                     {}  # Empty metrics since generation failed
                 )
             except Exception as e:
-                self.logger.error(f"Failed to send error notification: {e}")
+                self.logger.error("Failed to send error notification: %s", e)
                 
-    def _send_health_alert(self, test_results: Dict[str, Any]):
+    def _send_health_alert(self, test_results: 'SystemTestResults'):
         """Send system health alert."""
         try:
-            failed_tests = [test for test, passed in test_results.items() 
-                          if not passed and test != 'overall_status']
+            failed_tests = test_results.failed_checks()
             
             alert_message = f"System health check found issues with: {', '.join(failed_tests)}"
             self.generator.email_sender.send_alert_email(
@@ -238,7 +328,7 @@ class ReportScheduler:
                 {}
             )
         except Exception as e:
-            self.logger.error(f"Failed to send health alert: {e}")
+            self.logger.error("Failed to send health alert: %s", e)
             
     def start_scheduler(self):
         """Start the scheduler in a separate thread."""
@@ -248,22 +338,31 @@ class ReportScheduler:
             
         self.setup_schedule()
         self.running = True
+        self._wake.clear()
         
         def run_scheduler():
             self.logger.info("🚀 Report scheduler started")
             
             while self.running:
                 try:
-                    schedule.run_pending()
-                    time.sleep(60)  # Check every minute
+                    self._run_due_jobs()
+                    
+                    # Sleep until the next job is due instead of polling; stop_scheduler() wakes us early
+                    idle = self._idle_seconds()
+                    timeout = MAX_IDLE_SECONDS if idle is None else min(max(idle, 1), MAX_IDLE_SECONDS)
+                    self._wake.wait(timeout=timeout)
+                    self._wake.clear()
                 except Exception as e:
-                    self.logger.error(f"Scheduler error: {e}")
-                    time.sleep(300)  # Wait 5 minutes before retrying
+                    self.logger.error("Scheduler error: %s", e)
+                    self._wake.wait(timeout=ERROR_RETRY_SECONDS)  # Retry later, unless stopped first
                     
             self.logger.info("⏹️ Report scheduler stopped")
             
-        self.scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
-        self.scheduler_thread.start()
+        # One job worker: report jobs share the generator and matplotlib state, so they must not overlap
+        self._job_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='report-job')
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='report-sched')
+        self._future = self._executor.submit(run_scheduler)
+        self._future.add_done_callback(self._on_worker_done)
         
         # Print next scheduled run
         self._print_schedule_info()
@@ -275,28 +374,51 @@ class ReportScheduler:
             
         self.logger.info("🛑 Stopping scheduler...")
         self.running = False
+        self._wake.set()
         
-        if self.scheduler_thread and self.scheduler_thread.is_alive():
-            self.scheduler_thread.join(timeout=5)
+        if self._executor:
+            # Give a running job a few seconds to finish, as the old thread join did
+            wait([self._future], timeout=5)
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            
+        if self._job_pool:
+            # Let a report that is already running finish instead of leaving a half-written PDF
+            self.logger.info("Waiting for running jobs to finish...")
+            self._job_pool.shutdown(wait=True)
+            self._job_pool = None
             
-        schedule.clear()
+        self._jobs.clear()
+        self._heap.clear()
         self.logger.info("✅ Scheduler stopped")
         
+    def wait(self):
+        """Block until the scheduler thread exits."""
+        if self._future:
+            wait([self._future])
+        
+    def _on_worker_done(self, future: Future):
+        """Log a scheduler thread that exited with an error and mark the scheduler stopped."""
+        if not future.cancelled() and future.exception() is not None:
+            self.logger.error("Scheduler thread crashed: %s", future.exception(), exc_info=future.exception())
+        self.running = False
+        
     def _print_schedule_info(self):
         """Print information about scheduled jobs."""
-        jobs = schedule.get_jobs()
+        jobs = self._jobs
         
         if jobs:
             print("\n📅 SCHEDULED JOBS:")
             print("="*50)
             
+            now = datetime.now()
             for job in jobs:
                 next_run = job.next_run
                 if next_run:
-                    time_until = next_run - datetime.now()
-                    days = time_until.days
-                    hours, remainder = divmod(time_until.seconds, 3600)
-                    minutes, _ = divmod(remainder, 60)
+                    seconds_until = max(int((next_run - now).total_seconds()), 0)
+                    days, remainder = divmod(seconds_until, 86400)
+                    hours, remainder = divmod(remainder, 3600)
+                    minutes = remainder // 60
                     
                     print(f"📊 {job.job_func.__name__}")
                     print(f"   Next run: {next_run.strftime('%A, %B %d at %H:%M')}")
@@ -307,7 +429,7 @@ class ReportScheduler:
             
     def _signal_handler(self, signum, frame):
         """Handle shutdown signals gracefully."""
-        self.logger.info(f"Received signal {signum}, shutting down...")
+        self.logger.info("Received signal %s, shutting down...", signum)
         self.stop_scheduler()
         sys.exit(0)
         
@@ -318,28 +440,22 @@ class ReportScheduler:
         
     def get_schedule_status(self) -> Dict[str, Any]:
         """Get current schedule status and information."""
-        jobs = schedule.get_jobs()
+        jobs = self._jobs
+        next_run = self._heap[0][0] if self._heap else None  # Earliest next run across all jobs
         
-        status = {
+        return {
             'running': self.running,
             'jobs_count': len(jobs),
-            'jobs': [],
-            'next_run': None
-        }
-        
-        if jobs:
-            next_job = min(jobs, key=lambda j: j.next_run if j.next_run else datetime.max)
-            status['next_run'] = next_job.next_run.isoformat() if next_job.next_run else None
-            
-            for job in jobs:
-                job_info = {
+            'jobs': [
+                {
                     'function': job.job_func.__name__,
                     'next_run': job.next_run.isoformat() if job.next_run else None,
-                    'interval': str(job.interval) if hasattr(job, 'interval') else 'unknown'
+                    'interval': job.interval
                 }
-                status['jobs'].append(job_info)
-                
-        return status
+                for job in jobs
+            ],
+            'next_run': next_run.isoformat() if next_run else None
+        }
 
 def main():
     """Main function for running the scheduler standalone."""
@@ -379,9 +495,8 @@ def main():
         print("🚀 Business Report Scheduler is running...")
         print("Press Ctrl+C to stop")
         
-        # Keep the main thread alive
-        while scheduler.running:
-            time.sleep(1)
+        # Block until the scheduler thread exits
+        scheduler.wait()
             
     except KeyboardInterrupt:
         print("\n🛑 Scheduler stopped by user")